@@ -62,48 +62,40 @@ def setup_logfire(service_name: str = "cultural-agents") -> None:
 class LogfireLogger:
     """
     Logger wrapper that sends logs to both standard logging and Logfire.
+    
+    Accepts %-style args like the standard logger (logger.info("sent %s", name)).
+    Standard logging formats them only when the level is enabled; Logfire still
+    receives every level, formatted only when Logfire is configured.
     """
     def __init__(self, name: str):
         self.name = name
         self._logger = logging.getLogger(name)
-        
-    def info(self, msg: str, **kwargs: Any) -> None:
-        """Log info message to both logging and Logfire."""
-        # Always log to console
-        self._logger.info(msg)
-        # Send to Logfire if configured
+    
+    def _log(self, level: int, logfire_method: str, msg: str, args: tuple, kwargs: dict) -> None:
+        """Emit to standard logging and, if configured, Logfire - formatting lazily."""
+        # Standard logging checks the level and formats %-args only when a handler emits
+        self._logger.log(level, msg, *args)
         if _logfire_configured:
             try:
-                logfire.info(msg, **{"logger": self.name, **kwargs})
+                getattr(logfire, logfire_method)(msg % args if args else msg, **{"logger": self.name, **kwargs})
             except Exception as e:
-                self._logger.debug(f"Failed to send to Logfire: {e}")
+                self._logger.debug("Failed to send to Logfire: %s", e)
+        
+    def info(self, msg: str, *args: Any, **kwargs: Any) -> None:
+        """Log info message to both logging and Logfire."""
+        self._log(logging.INFO, "info", msg, args, kwargs)
     
-    def error(self, msg: str, **kwargs: Any) -> None:
+    def error(self, msg: str, *args: Any, **kwargs: Any) -> None:
         """Log error message to both logging and Logfire."""
-        self._logger.error(msg)
-        if _logfire_configured:
-            try:
-                logfire.error(msg, **{"logger": self.name, **kwargs})
-            except Exception as e:
-                self._logger.debug(f"Failed to send to Logfire: {e}")
+        self._log(logging.ERROR, "error", msg, args, kwargs)
     
-    def warning(self, msg: str, **kwargs: Any) -> None:
+    def warning(self, msg: str, *args: Any, **kwargs: Any) -> None:
         """Log warning message to both logging and Logfire."""
-        self._logger.warning(msg)
-        if _logfire_configured:
-            try:
-                logfire.warn(msg, **{"logger": self.name, **kwargs})
-            except Exception as e:
-                self._logger.debug(f"Failed to send to Logfire: {e}")
+        self._log(logging.WARNING, "warn", msg, args, kwargs)
     
-    def debug(self, msg: str, **kwargs: Any) -> None:
+    def debug(self, msg: str, *args: Any, **kwargs: Any) -> None:
         """Log debug message to both logging and Logfire."""
-        self._logger.debug(msg)
-        if _logfire_configured:
-            try:
-                logfire.debug(msg, **{"logger": self.name, **kwargs})
-            except Exception as e:
-                self._logger.debug(f"Failed to send to Logfire: {e}")
+        self._log(logging.DEBUG, "debug", msg, args, kwargs)
     
     # Maintain compatibility with standard logger interface
     warn = warning
@@ -27,9 +27,13 @@ from .group import (
 
 from .participant import (
     get_participant_messages,  # Get user's messages from group history
+    get_participant_message_count,  # Count one user's messages in group history
+    get_participant_message_counts,  # Count messages for all users in one pass
     initialize_participants,  # Create JSON files for all participants
     save_personality_analysis,  # Add new personality snapshot
+    save_personality_analyses,  # Add snapshots for several participants in one pass
     get_participant_data,  # Retrieve participant's full data
+    get_all_participants_data,  # Retrieve several participants in one pass
     list_participants  # Get all participants with message counts
 )
 
@@ -65,9 +69,13 @@ __all__ = [
     
     # Participant
     'get_participant_messages',
+    'get_participant_message_count',
+    'get_participant_message_counts',
     'initialize_participants',
     'save_personality_analysis',
+    'save_personality_analyses',
     'get_participant_data',
+    'get_all_participants_data',
     'list_participants',
     
     # Actions
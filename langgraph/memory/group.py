@@ -3,13 +3,9 @@ Group data management - fetch and store group information from Telegram.
 All data comes from Telegram API, nothing is hardcoded.
 """
 import os
-import sys
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
-# Add parent directory to import telegram_exm_yair
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from .storage import save_json, load_json, get_group_directory
 import logging
 
@@ -69,6 +69,37 @@ def get_participant_messages(
     return user_messages
 
 
+def get_participant_message_counts(chat_id: str) -> Dict[str, int]:
+    """
+    Count messages per sender in the group history (single pass, no copies).
+    
+    Args:
+        chat_id: Telegram chat ID
+        
+    Returns:
+        Dict mapping user_id (str) -> number of messages sent
+    """
+    counts: Dict[str, int] = {}
+    for msg in get_group_messages(chat_id):
+        sender_id = str(msg.get("senderId"))
+        counts[sender_id] = counts.get(sender_id, 0) + 1
+    return counts
+
+
+def get_participant_message_count(chat_id: str, user_id: str) -> int:
+    """
+    Get the number of messages a user sent in the group.
+    
+    Args:
+        chat_id: Telegram chat ID
+        user_id: User ID to count messages for
+        
+    Returns:
+        Number of messages sent by this user
+    """
+    return get_participant_message_counts(chat_id).get(str(user_id), 0)
+
+
 def initialize_participants(
     chat_id: str,
     verbose: bool = True
@@ -175,11 +206,31 @@ def initialize_participants(
         }
 
 
+def _build_personality_snapshot(
+    big5_results: Dict[str, Dict[str, Any]],
+    message_count: int
+) -> Dict[str, Any]:
+    """Build a personality snapshot entry (shared by the single and bulk save)."""
+    # Calculate overall confidence (average across traits)
+    trait_confidences = [big5_results[t].get("confidence", 0.5) for t in big5_results]
+    overall_confidence = round(sum(trait_confidences) / len(trait_confidences), 2) if trait_confidences else 0.5
+    
+    # Create new snapshot with human-readable date
+    return {
+        "analysis_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "messages_analyzed_count": message_count,
+        "personality_analysis": {
+            "big5": big5_results
+        },
+        "overall_confidence": overall_confidence
+    }
+
+
 def save_personality_analysis(
     chat_id: str,
     user_id: str,
     big5_results: Optional[Dict[str, Dict[str, Any]]] = None,
-
+    message_count: Optional[int] = None,
     verbose: bool = True
 ) -> Dict[str, Any]:
     """
@@ -201,6 +252,7 @@ def save_personality_analysis(
                       If None, generates random values (for testing only).
         last_analyzed_message_id: The highest message ID that was considered in this analysis.
                                   Used for cold start synchronization.
+        message_count: Number of messages the user has sent (counted from group history if None)
         verbose: Print progress
         
     Returns:
@@ -222,8 +274,8 @@ def save_personality_analysis(
     participant_data = load_json(participant_path)
     
     # Get message count
-    messages = get_participant_messages(chat_id, user_id)
-    message_count = len(messages)
+    if message_count is None:
+        message_count = get_participant_message_count(chat_id, user_id)
     
     # Generate random values if none provided (for testing only)
     if big5_results is None:
@@ -236,19 +288,8 @@ def save_personality_analysis(
             for trait in ["openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism"]
         }
     
-    # Calculate overall confidence (average across traits)
-    trait_confidences = [big5_results[t].get("confidence", 0.5) for t in big5_results]
-    overall_confidence = round(sum(trait_confidences) / len(trait_confidences), 2) if trait_confidences else 0.5
-    
-    # Create new snapshot with human-readable date
-    new_snapshot = {
-        "analysis_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "messages_analyzed_count": message_count,
-        "personality_analysis": {
-            "big5": big5_results
-        },
-        "overall_confidence": overall_confidence
-    }
+    new_snapshot = _build_personality_snapshot(big5_results, message_count)
+    overall_confidence = new_snapshot["overall_confidence"]
     
     # Insert at beginning so most recent is first
     participant_data["personality_snapshots"].insert(0, new_snapshot)
@@ -274,6 +315,67 @@ def save_personality_analysis(
     }
 
 
+def save_personality_analyses(
+    chat_id: str,
+    analyses: Dict[str, Dict[str, Dict[str, Any]]],
+    message_counts: Optional[Dict[str, int]] = None,
+    participants: Optional[Dict[str, Dict[str, Any]]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Save Big5 personality analyses for several participants in one pass.
+    
+    Each participant keeps its own file, but message counts are computed once
+    and participant files the caller already loaded are not read again.
+    Like save_personality_analysis, this is a pure storage layer.
+    
+    Args:
+        chat_id: Telegram chat ID
+        analyses: Dict mapping user_id -> big5_results (same format as save_personality_analysis)
+        message_counts: Dict mapping user_id -> message count (counted from group history if None)
+        participants: Preloaded participant data by user_id, e.g. from get_all_participants_data.
+                      Not modified; users missing from it are loaded from disk.
+        
+    Returns:
+        Dict mapping user_id -> result dict (same format as save_personality_analysis)
+    """
+    participant_dir = get_participant_directory(chat_id)
+    participants = participants or {}
+    
+    if message_counts is None:
+        message_counts = get_participant_message_counts(chat_id)
+    
+    results = {}
+    for user_id, big5_results in analyses.items():
+        participant_path = os.path.join(participant_dir, f"{user_id}.json")
+        participant_data = participants.get(str(user_id)) or load_json(participant_path)
+        
+        if not participant_data:
+            results[user_id] = {
+                "success": False,
+                "error": f"Participant {user_id} not found"
+            }
+            continue
+        
+        message_count = message_counts.get(str(user_id), 0)
+        new_snapshot = _build_personality_snapshot(big5_results, message_count)
+        
+        # New snapshots list so the caller's preloaded data is left untouched
+        snapshots = [new_snapshot, *participant_data.get("personality_snapshots", [])]
+        save_json(participant_path, {**participant_data, "personality_snapshots": snapshots})
+        
+        results[user_id] = {
+            "success": True,
+            "user_id": user_id,
+            "username": participant_data.get("username"),
+            "messages_analyzed": message_count,
+            "overall_confidence": new_snapshot["overall_confidence"],
+            "trait_results": big5_results,
+            "total_snapshots": len(snapshots)
+        }
+    
+    return results
+
+
 def get_participant_data(
     chat_id: str,
     user_id: str
@@ -293,6 +395,38 @@ def get_participant_data(
     return load_json(participant_path)
 
 
+def get_all_participants_data(
+    chat_id: str,
+    user_ids: Optional[List[str]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Get data for several participants in one pass.
+    
+    Args:
+        chat_id: Telegram chat ID
+        user_ids: User IDs to load (if None, loads every participant file)
+        
+    Returns:
+        Dict mapping user_id -> participant data (missing participants are omitted)
+    """
+    participant_dir = get_participant_directory(chat_id)
+    
+    if user_ids is None:
+        user_ids = [
+            filename[:-len(".json")]
+            for filename in os.listdir(participant_dir)
+            if filename.endswith(".json")
+        ]
+    
+    participants = {}
+    for user_id in user_ids:
+        data = load_json(os.path.join(participant_dir, f"{user_id}.json"))
+        if data:
+            participants[str(user_id)] = data
+    
+    return participants
+
+
 def get_last_analyzed_message_id(
     chat_id: str,
     user_id: str
@@ -342,17 +476,18 @@ def list_participants(chat_id: str) -> List[Dict[str, Any]]:
     if not os.path.exists(participant_dir):
         return participants
     
+    # Get message counts dynamically (one pass over group history)
+    message_counts = get_participant_message_counts(chat_id)
+    
     for filename in os.listdir(participant_dir):
         if filename.endswith(".json"):
             user_id = filename.replace(".json", "")
             data = get_participant_data(chat_id, user_id)
             if data:
-                # Get message count dynamically
-                messages = get_participant_messages(chat_id, user_id)
                 participants.append({
                     "user_id": data.get("user_id"),
                     "username": data.get("username"),
-                    "message_count": len(messages),
+                    "message_count": message_counts.get(user_id, 0),
                     "snapshots_count": len(data.get("personality_snapshots", []))
                 })
     
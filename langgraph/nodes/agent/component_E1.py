@@ -5,9 +5,6 @@ from langchain.chat_models import init_chat_model
 import logfire
 
 # utilities
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from utils import format_recent_actions, load_prompt, get_model_settings, format_message_for_prompt, format_other_agents_for_prompt, format_personality_summary
 from logs.logfire_config import get_logger
 from logs import log_node_start, log_node_output, log_state
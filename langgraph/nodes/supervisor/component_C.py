@@ -2,24 +2,33 @@
 Component C: Personality Analysis Node (Big Five / OCEAN Model)
 
 Analyzes personality traits for participants based on their messages.
-Runs 5 parallel API calls (one per trait) and saves results to memory.
+Runs either 5 parallel API calls (one per trait) or a single batched API call
+covering all traits, and saves results to memory. The batched call is used when
+batch_traits is true, or when at least batch_traits_min_users users need analysis.
 """
 
+import asyncio
+import hashlib
 import json
-from concurrent.futures import ThreadPoolExecutor
-from typing import Dict, Any, List, Tuple
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional, Tuple
+import orjson
 from langchain_core.messages import HumanMessage
 from langchain.chat_models import init_chat_model
 
 # utilities
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from utils import (
     load_prompt, 
     get_model_settings, 
     format_message_for_prompt, 
-    is_agent_sender, 
+    get_all_agent_names,
+    build_agent_identity_sets,
+    is_agent_identity,
     load_agent_personas,
     get_agent_display_names,
     build_display_name
@@ -30,10 +39,11 @@ from logs import log_node_start, log_prompt, log_node_output
 # Memory system
 from memory import (
     get_participant_data,
-    get_participant_messages,
+    get_all_participants_data,
+    get_participant_message_counts,
     get_last_analyzed_message_id,
     save_last_analyzed_message_id,
-    save_personality_analysis,
+    save_personality_analyses,
     initialize_participants,
     list_participants
 )
@@ -52,9 +62,43 @@ CONFIDENCE_THRESHOLDS = PERSONALITY_CONFIG.get("confidence_thresholds", {})
 CONFIDENCE_PENALTY_CONFIG = PERSONALITY_CONFIG.get("message_count_confidence_penalty", {})
 STOP_REANALYSIS_WHEN_CONFIDENT = PERSONALITY_CONFIG.get("stop_reanalysis_when_confident", True)
 MAX_RECENT_MESSAGES = CONFIG.get("polling", {}).get("max_recent_messages", 50)
+# batch_traits=true forces the fused call on every run and takes precedence over
+# batch_traits_min_users; with it off (the shipped default), the fused call is only
+# used once this many users need analysis
+BATCH_TRAITS = PERSONALITY_CONFIG.get("batch_traits", False)
+BATCH_TRAITS_MIN_USERS = PERSONALITY_CONFIG.get("batch_traits_min_users")
+LLM_TIMEOUT_SECONDS = PERSONALITY_CONFIG.get("llm_timeout_seconds", 60)
 
 # Big Five traits
-BIG5_TRAITS = ["openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism"]
+BIG5_TRAITS = ("openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism")
+
+# Exact-match cache of raw LLM responses, keyed by (trait, prompt hash).
+# An identical prompt (same conversation, constraints and prior analysis) gets the same answer.
+_RESPONSE_CACHE_SIZE = 32
+_RESPONSE_CACHE: "OrderedDict[Tuple[str, bytes], str]" = OrderedDict()
+
+# Formatted conversation lines carried across runs - consecutive supervisor runs
+# share most of recent_messages, so only the newly polled messages are formatted.
+# Cleared whenever the configured agent names change (they affect the "(Agent)" tag).
+_FORMAT_CACHE_SIZE = 512
+_FORMAT_CACHE: "OrderedDict[tuple, str]" = OrderedDict()
+_format_cache_agents: Tuple[str, ...] = ()
+
+# Providers whose chat API supports response_format={"type": "json_object"}
+JSON_MODE_PROVIDERS = {"openai"}
+
+# Annotations the LLM may echo after a name, e.g. "(Agent)", "(YOU)"
+_USERNAME_ANNOTATION_RE = re.compile(r'\s*\([^)]*\)\s*')
+
+# Markdown code block around a JSON response, e.g. ```json {...} ```
+_JSON_FENCE_RE = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.DOTALL)
+
+# Persistent event loop for the async LLM calls, run in a background thread.
+# langchain-openai keeps one process-wide async HTTP client bound to the loop it
+# was first used on, so a fresh asyncio.run loop per run would break the second
+# run with "Event loop is closed".
+_LLM_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LLM_LOOP_LOCK = threading.Lock()
 
 
 def apply_confidence_penalty(
@@ -71,22 +115,25 @@ def apply_confidence_penalty(
     Args:
         big5_results: Dict of trait -> {score, confidence, justification}
         message_count: Number of messages analyzed
-        penalty_config: Config dict with min_messages_full_confidence and penalty_factor
+        penalty_config: Config dict with enabled, min_messages_full_confidence and penalty_factor
         
     Returns:
         Modified big5_results with adjusted confidence scores
     """
+    # Penalty can be switched off in config
+    if not penalty_config.get("enabled", True):
+        return big5_results
+    
     min_messages = penalty_config.get("min_messages_full_confidence", 15)
-    penalty_factor = penalty_config.get("penalty_factor", 0.03)
     
     # Only apply penalty if below threshold
     if message_count >= min_messages:
         return big5_results
     
-    # Apply penalty to each trait
-    penalty = (min_messages - message_count) * penalty_factor
+    # Same penalty for every trait - compute once
+    penalty = (min_messages - message_count) * penalty_config.get("penalty_factor", 0.03)
     
-    for trait, data in big5_results.items():
+    for data in big5_results.values():
         raw_confidence = data.get("confidence", 0)
         # Store raw confidence for transparency
         data["raw_confidence"] = raw_confidence
@@ -96,66 +143,153 @@ def apply_confidence_penalty(
     return big5_results
 
 
-def build_username_userid_mapping(messages: List[Dict]) -> Dict[str, str]:
+@dataclass(slots=True)
+class _PreprocessedMessages:
+    """Per-message fields extracted in one pass over recent_messages (parallel lists)."""
+    display_names: List[str]
+    user_ids: List[str]
+    message_ids: List[Any]
+    processed: List[bool]
+    is_agent: List[bool]
+    formatted: Optional[List[str]] = None  # filled on first use by format_conversation_for_prompt
+
+
+def _preprocess_messages(
+    messages: List[Dict],
+    agent_personas: List[Dict] = None
+) -> _PreprocessedMessages:
     """
-    Build a mapping from display name -> user_id from messages.
-    Uses the same name format as format_message_for_prompt (first_name + last_name).
+    Extract display name, user_id, processed flag and agent flag for every
+    message in a single pass.
     
     Args:
-        messages: List of message dicts with sender info and sender_id
+        messages: List of message dicts
+        agent_personas: List of agent persona dicts (if None, no message is flagged as agent)
         
     Returns:
-        Dict mapping display name (lowercase) to user_id
+        _PreprocessedMessages with one entry per message in each list
     """
-    mapping = {}
+    pre = _PreprocessedMessages([], [], [], [], [])
+    agent_identity = build_agent_identity_sets(agent_personas) if agent_personas is not None else None
+    # Senders repeat across the window - resolve each sender's name/agent flag once.
+    # Keyed on the full identity so a participant who renames mid-window is not shown stale.
+    sender_cache: Dict[Tuple[str, Any, Any, Any], Tuple[str, bool]] = {}
+    
     for msg in messages:
         user_id = str(msg.get("sender_id", "")).strip()
-        if not user_id:
-            continue
-        
-        # Build display name using shared utility
-        display_name = build_display_name(
-            first_name=msg.get("sender_first_name", ""),
-            last_name=msg.get("sender_last_name", ""),
-            username=msg.get("sender_username", "")
+        sender_key = (
+            user_id,
+            msg.get("sender_first_name"),
+            msg.get("sender_last_name"),
+            msg.get("sender_username"),
         )
-        if not display_name:
-            continue
+        sender = sender_cache.get(sender_key) if user_id else None
+        if sender is None:
+            # Build display name using shared utility
+            sender = (
+                build_display_name(
+                    first_name=msg.get("sender_first_name", ""),
+                    last_name=msg.get("sender_last_name", ""),
+                    username=msg.get("sender_username", "")
+                ),
+                agent_identity is not None and is_agent_identity(agent_identity, message=msg)
+            )
+            if user_id:
+                sender_cache[sender_key] = sender
         
-        mapping[display_name.lower()] = user_id
+        pre.display_names.append(sender[0])
+        pre.user_ids.append(user_id)
+        pre.message_ids.append(msg.get("message_id"))
+        pre.processed.append(msg.get("processed", False))
+        pre.is_agent.append(sender[1])
     
-    return mapping
+    return pre
 
 
-def count_user_messages(messages: List[Dict]) -> Dict[str, int]:
+def build_username_userid_mapping(
+    messages: List[Dict],
+    preprocessed: _PreprocessedMessages = None
+) -> Dict[str, str]:
+    """
+    Build a mapping from display name -> user_id from messages.
+    Uses the same name format as format_message_for_prompt (first_name + last_name).
+    
+    Args:
+        messages: List of message dicts with sender info and sender_id
+        preprocessed: Output of _preprocess_messages for these messages (computed if None)
+        
+    Returns:
+        Dict mapping display name (lowercase) to user_id
+    """
+    pre = preprocessed if preprocessed is not None else _preprocess_messages(messages)
+    return {
+        display_name.lower(): user_id
+        for display_name, user_id in zip(pre.display_names, pre.user_ids)
+        if display_name and user_id
+    }
+
+
+def count_user_messages(
+    messages: List[Dict],
+    preprocessed: _PreprocessedMessages = None
+) -> Dict[str, int]:
     """
     Count messages per user by display name.
     Uses the same name format as format_message_for_prompt.
     
     Args:
         messages: List of message dicts
+        preprocessed: Output of _preprocess_messages for these messages (computed if None)
         
     Returns:
         Dict mapping display name (lowercase) to message count
     """
-    counts = {}
-    for msg in messages:
-        # Build display name using shared utility
-        display_name = build_display_name(
-            first_name=msg.get("sender_first_name", ""),
-            last_name=msg.get("sender_last_name", ""),
-            username=msg.get("sender_username", "")
-        )
-        if not display_name:
-            continue
-        
-        key = display_name.lower()
-        counts[key] = counts.get(key, 0) + 1
+    pre = preprocessed if preprocessed is not None else _preprocess_messages(messages)
+    return dict(Counter(name.lower() for name in pre.display_names if name))
+
+
+def _sync_format_cache() -> None:
+    """Drop cached formatted lines if the configured agent names changed."""
+    global _format_cache_agents
+    agent_names = tuple(get_all_agent_names())
+    if agent_names != _format_cache_agents:
+        _FORMAT_CACHE.clear()
+        _format_cache_agents = agent_names
+
+
+def _format_message_cached(msg: Dict) -> str:
+    """
+    Format a message for the personality prompt, reusing the line from a previous
+    run if every field that affects it is unchanged.
+    """
+    reactions = msg.get('reactions') or ()
+    key = (
+        msg.get('message_id'),
+        str(msg.get('date')),
+        msg.get('text', ''),
+        msg.get('sender_first_name', ''),
+        msg.get('sender_last_name', ''),
+        msg.get('sender_username', ''),
+        tuple((r.get('emoji'), r.get('count'), tuple(r.get('users') or ())) for r in reactions)
+    )
     
-    return counts
+    formatted = _FORMAT_CACHE.get(key)
+    if formatted is not None:
+        _FORMAT_CACHE.move_to_end(key)
+        return formatted
+    
+    # No emotion since we're analyzing personality, not emotions
+    formatted = format_message_for_prompt(msg, include_timestamp=True, include_emotion=False)
+    _FORMAT_CACHE[key] = formatted
+    if len(_FORMAT_CACHE) > _FORMAT_CACHE_SIZE:
+        _FORMAT_CACHE.popitem(last=False)
+    return formatted
 
 
-def format_conversation_for_prompt(messages: List[Dict]) -> str:
+def format_conversation_for_prompt(
+    messages: List[Dict],
+    preprocessed: _PreprocessedMessages = None
+) -> str:
     """
     Format messages into conversation string for the prompt.
     Uses the shared format_message_for_prompt utility.
@@ -163,30 +297,33 @@ def format_conversation_for_prompt(messages: List[Dict]) -> str:
     
     Args:
         messages: List of message dicts
+        preprocessed: Output of _preprocess_messages for these messages (computed if None)
         
     Returns:
         Formatted conversation string
     """
-    lines = []
-    for msg in messages:
-        # Use utility function - no emotion since we're analyzing personality, not emotions
-        formatted = format_message_for_prompt(
-            msg, 
-            include_timestamp=True, 
-            include_emotion=False
+    _sync_format_cache()
+    
+    if preprocessed is None:
+        # Standalone call: stream straight into the join, no intermediate lists
+        return "\n".join(
+            _format_message_cached(msg) + ("" if msg.get('processed') else " [NEW]")
+            for msg in messages
         )
-        # Add [NEW] suffix for unprocessed messages
-        if not msg.get('processed', False):
-            formatted = f"{formatted} [NEW]"
-        lines.append(formatted)
     
-    return "\n".join(lines)
+    if preprocessed.formatted is None:
+        preprocessed.formatted = [_format_message_cached(msg) for msg in messages]
+    return "\n".join(
+        formatted + ("" if processed else " [NEW]")
+        for formatted, processed in zip(preprocessed.formatted, preprocessed.processed)
+    )
 
 
 def is_user_confident_enough(
     chat_id: str,
     user_id: str,
-    confidence_thresholds: Dict[str, float]
+    confidence_thresholds: Dict[str, float],
+    participants_cache: Dict[str, Dict[str, Any]] = None
 ) -> Tuple[bool, Dict[str, Any]]:
     """
     Check if a user already has confident enough personality analysis.
@@ -195,11 +332,15 @@ def is_user_confident_enough(
         chat_id: Telegram chat ID
         user_id: User ID to check
         confidence_thresholds: Dict of trait -> threshold
+        participants_cache: Preloaded user_id -> participant data (skips the disk read)
         
     Returns:
         Tuple of (is_confident_enough, latest_analysis_or_empty)
     """
-    participant_data = get_participant_data(chat_id, user_id)
+    if participants_cache is not None:
+        participant_data = participants_cache.get(user_id)
+    else:
+        participant_data = get_participant_data(chat_id, user_id)
     
     if not participant_data:
         return False, {}
@@ -216,15 +357,10 @@ def is_user_confident_enough(
         return False, {}
     
     # Check if all traits meet confidence threshold
-    all_confident = True
-    for trait in BIG5_TRAITS:
-        trait_data = big5.get(trait, {})
-        confidence = trait_data.get("confidence", 0)
-        threshold = confidence_thresholds.get(trait, 0.9)
-        
-        if confidence < threshold:
-            all_confident = False
-            break
+    all_confident = all(
+        big5.get(trait, {}).get("confidence", 0) >= confidence_thresholds.get(trait, 0.9)
+        for trait in BIG5_TRAITS
+    )
     
     return all_confident, big5
 
@@ -271,7 +407,8 @@ def build_constraints_string(
 
 def get_existing_analysis_for_users(
     chat_id: str,
-    users_to_analyze: Dict[str, str]
+    users_to_analyze: Dict[str, str],
+    participants_cache: Dict[str, Dict[str, Any]] = None
 ) -> Dict[str, Dict[str, Any]]:
     """
     Get existing personality analysis for users who are being analyzed.
@@ -279,6 +416,7 @@ def get_existing_analysis_for_users(
     Args:
         chat_id: Telegram chat ID
         users_to_analyze: Dict mapping display_name -> user_id
+        participants_cache: Preloaded user_id -> participant data (skips the disk reads)
         
     Returns:
         Dict mapping display_name -> {trait -> {score, justification}} for users with prior analysis
@@ -286,7 +424,10 @@ def get_existing_analysis_for_users(
     existing_analysis = {}
     
     for display_name, user_id in users_to_analyze.items():
-        participant_data = get_participant_data(chat_id, user_id)
+        if participants_cache is not None:
+            participant_data = participants_cache.get(user_id)
+        else:
+            participant_data = get_participant_data(chat_id, user_id)
         if not participant_data:
             continue
         
@@ -304,22 +445,26 @@ def get_existing_analysis_for_users(
     return existing_analysis
 
 
-def build_existing_analysis_string(
+EXISTING_ANALYSIS_INSTRUCTIONS = (
+    "**How to identify new messages:** Messages ending with **[NEW]** are unprocessed and weren't considered in prior analysis. "
+    "Focus on these to determine if they change or support the prior assessment.\n\n"
+    "**Instructions for previously analyzed users:**\n"
+    "- Only change the score if [NEW] messages provide clear evidence that **contradicts or extends** your previous assessment.\n"
+    "- For each previously analyzed user, add these fields **INSIDE their JSON object**:\n"
+    "  - `\"changed\": false` if you keep the same score\n"
+    "  - `\"changed\": true` if you change the score\n"
+    "  - `\"change_reason\"` explaining why (only when changed=true)\n"
+    "- For users WITHOUT prior analysis, do NOT include the `changed` field.\n"
+    "- Example: `{\"Alice\": {\"score\": 4, \"confidence\": 0.85, \"justification\": \"...\", \"changed\": false}}`"
+)
+
+
+def _existing_analysis_lines(
     trait: str,
     existing_analysis: Dict[str, Dict[str, Any]],
     users_to_analyze: List[str]
-) -> str:
-    """
-    Build the existing analysis section for a specific trait prompt.
-    
-    Args:
-        trait: The trait being analyzed (e.g., "openness")
-        existing_analysis: Dict mapping display_name -> {trait -> {score, justification}}
-        users_to_analyze: List of display names being analyzed
-        
-    Returns:
-        Existing analysis string for prompt injection (empty if no prior analysis)
-    """
+) -> List[str]:
+    """Build the per-user "previous score" lines for a single trait."""
     lines = []
     
     for display_name in users_to_analyze:
@@ -339,29 +484,111 @@ def build_existing_analysis_string(
             f"  Previous justification: \"{justification}\""
         )
     
+    return lines
+
+
+def build_existing_analysis_string(
+    trait: str,
+    existing_analysis: Dict[str, Dict[str, Any]],
+    users_to_analyze: List[str]
+) -> str:
+    """
+    Build the existing analysis section for a specific trait prompt.
+    
+    Args:
+        trait: The trait being analyzed (e.g., "openness")
+        existing_analysis: Dict mapping display_name -> {trait -> {score, justification}}
+        users_to_analyze: List of display names being analyzed
+        
+    Returns:
+        Existing analysis string for prompt injection (empty if no prior analysis)
+    """
+    lines = _existing_analysis_lines(trait, existing_analysis, users_to_analyze)
+    
     if not lines:
         return ""
     
     return (
         "The following users have been analyzed before. Review their previous analysis:\n\n"
         + "\n\n".join(lines) + "\n\n"
-        "**How to identify new messages:** Messages ending with **[NEW]** are unprocessed and weren't considered in prior analysis. "
-        "Focus on these to determine if they change or support the prior assessment.\n\n"
-        "**Instructions for previously analyzed users:**\n"
-        "- Only change the score if [NEW] messages provide clear evidence that **contradicts or extends** your previous assessment.\n"
-        "- For each previously analyzed user, add these fields **INSIDE their JSON object**:\n"
-        "  - `\"changed\": false` if you keep the same score\n"
-        "  - `\"changed\": true` if you change the score\n"
-        "  - `\"change_reason\"` explaining why (only when changed=true)\n"
-        "- For users WITHOUT prior analysis, do NOT include the `changed` field.\n"
-        "- Example: `{\"Alice\": {\"score\": 4, \"confidence\": 0.85, \"justification\": \"...\", \"changed\": false}}`"
+        + EXISTING_ANALYSIS_INSTRUCTIONS
+    )
+
+
+def build_batched_existing_analysis_string(
+    existing_analysis: Dict[str, Dict[str, Any]],
+    users_to_analyze: List[str]
+) -> str:
+    """
+    Build the existing analysis section for the batched all-traits prompt.
+    
+    Previous analysis is grouped under a "[trait]" header per trait so the LLM can
+    match each block to the corresponding key in its output. The instructions are
+    included only once.
+    
+    Args:
+        existing_analysis: Dict mapping display_name -> {trait -> {score, justification}}
+        users_to_analyze: List of display names being analyzed
+        
+    Returns:
+        Existing analysis string for prompt injection (empty if no prior analysis)
+    """
+    sections = []
+    for trait in BIG5_TRAITS:
+        lines = _existing_analysis_lines(trait, existing_analysis, users_to_analyze)
+        if lines:
+            sections.append(f"[{trait}]\n" + "\n\n".join(lines))
+    
+    if not sections:
+        return ""
+    
+    return (
+        "The following users have been analyzed before. Review their previous analysis:\n\n"
+        + "\n\n".join(sections) + "\n\n"
+        + EXISTING_ANALYSIS_INSTRUCTIONS
     )
 
 
+def use_batched_traits(users_to_analyze: List[str]) -> bool:
+    """
+    Decide whether this run uses the single all-traits call.
+    
+    batch_traits=true always batches and wins over the threshold. Otherwise batched
+    mode kicks in for large backlogs (batch_traits_min_users), e.g. when
+    bootstrapping a new chat, where 5x the prompt tokens costs the most.
+    """
+    if BATCH_TRAITS:
+        return True
+    return BATCH_TRAITS_MIN_USERS is not None and len(users_to_analyze) >= BATCH_TRAITS_MIN_USERS
+
+
+def build_existing_analysis_strings(
+    existing_analysis: Dict[str, Dict[str, Any]],
+    users_to_analyze: List[str]
+) -> Dict[str, str]:
+    """
+    Build every existing analysis string needed for one run.
+    
+    Args:
+        existing_analysis: Dict mapping display_name -> {trait -> {score, justification}}
+        users_to_analyze: List of display names being analyzed
+        
+    Returns:
+        {"all_traits": str} in batched mode, otherwise Dict mapping trait -> str
+    """
+    if use_batched_traits(users_to_analyze):
+        return {"all_traits": build_batched_existing_analysis_string(existing_analysis, users_to_analyze)}
+    return {
+        trait: build_existing_analysis_string(trait, existing_analysis, users_to_analyze)
+        for trait in BIG5_TRAITS
+    }
+
+
 def identify_users_with_new_messages(
     recent_messages: List[Dict],
     agent_personas: List[Dict],
-    chat_id: str
+    chat_id: str,
+    preprocessed: _PreprocessedMessages = None
 ) -> Tuple[set, Dict[str, str]]:
     """
     Identify users who have unprocessed (new) messages.
@@ -373,10 +600,13 @@ def identify_users_with_new_messages(
         recent_messages: List of message dicts
         agent_personas: List of agent persona dicts
         chat_id: Telegram chat ID for persistent storage lookup
+        preprocessed: Output of _preprocess_messages for these messages (computed if None)
         
     Returns:
         Tuple of (set of user_ids with new messages, dict of display_name -> user_id for those users)
     """
+    pre = preprocessed if preprocessed is not None else _preprocess_messages(recent_messages, agent_personas)
+    
     # Cold start check: get last analyzed message ID from group metadata
     last_analyzed_id = get_last_analyzed_message_id(chat_id)
     if last_analyzed_id:
@@ -385,33 +615,21 @@ def identify_users_with_new_messages(
     users_with_new_messages = set()
     new_user_mapping = {}
     
-    for msg in recent_messages:
+    for display_name, sender_id, msg_id, processed, is_agent in zip(
+        pre.display_names, pre.user_ids, pre.message_ids, pre.processed, pre.is_agent
+    ):
         # Only consider unprocessed messages as "new" (ephemeral state)
-        if msg.get('processed', False):
+        if processed:
             continue
         
         # Cold start filter: skip messages already analyzed in previous run
         if last_analyzed_id is not None:
-            msg_id = msg.get('message_id')
             if msg_id and int(msg_id) <= int(last_analyzed_id):
                 logger.debug(f"Skipping message {msg_id} (already analyzed, last={last_analyzed_id})")
                 continue
-            
-        sender_id = str(msg.get('sender_id', '')).strip()
-        if not sender_id:
-            continue
-            
-        # Skip agents
-        if is_agent_sender(message=msg, agent_personas=agent_personas):
-            continue
         
-        # Build display name using shared utility
-        display_name = build_display_name(
-            first_name=msg.get("sender_first_name", ""),
-            last_name=msg.get("sender_last_name", ""),
-            username=msg.get("sender_username", "")
-        )
-        if not display_name:
+        # Skip messages without sender, agents, and senders without a display name
+        if not sender_id or is_agent or not display_name:
             continue
         
         users_with_new_messages.add(sender_id)
@@ -420,58 +638,155 @@ def identify_users_with_new_messages(
     return users_with_new_messages, new_user_mapping
 
 
-def analyze_single_trait(
-    trait: str,
+def build_trait_prompts(
     conversation: str,
-    model_name: str,
-    temperature: float,
-    provider: str,
-    constraints: str = "",
-    existing_analysis_str: str = ""
+    constraints: str,
+    existing_analysis_strs: Dict[str, str]
+) -> Dict[str, Tuple[str, str]]:
+    """
+    Build the (prefix, body) prompt for every call of one run.
+    
+    The prefix holds the conversation and constraints and is byte-identical for
+    every trait call, so providers with prompt caching can reuse it; it is
+    substituted once and shared by every prompt. The body holds the
+    trait-specific instructions and previous analysis.
+    
+    Args:
+        conversation: Formatted conversation string
+        constraints: Constraints string to inject into prompt
+        existing_analysis_strs: Output of build_existing_analysis_strings
+        
+    Returns:
+        Dict mapping trait (or "all_traits") -> (shared_prefix, trait_body)
+    """
+    # load_prompt caches templates by file mtime, so edits are picked up on the next run
+    prefix = load_prompt("supervisor_graph/component_C/shared_prefix.txt").replace("{{CONVERSATION}}", conversation)
+    prefix = prefix.replace("{{CONSTRAINTS}}", constraints)
+    return {
+        name: (
+            prefix,
+            load_prompt(f"supervisor_graph/component_C/{name}.txt").replace("{{EXISTING_ANALYSIS}}", existing_analysis_str)
+        )
+        for name, existing_analysis_str in existing_analysis_strs.items()
+    }
+
+
+def build_prompt_message(prefix: str, body: str, provider: str) -> HumanMessage:
+    """
+    Build the LLM message for a (prefix, body) prompt pair.
+    
+    Anthropic requires an explicit cache_control marker on the shared prefix;
+    OpenAI caches identical prefixes automatically, so a plain string is enough.
+    """
+    if provider == "anthropic":
+        return HumanMessage(content=[
+            {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": body}
+        ])
+    return HumanMessage(content=prefix + body)
+
+
+def parse_llm_json(response_text: str, provider: str) -> Dict[str, Any]:
+    """
+    Parse a JSON object from an LLM response.
+    
+    OpenAI calls run in JSON mode, so the response is parsed directly. Other
+    providers may wrap the JSON in a markdown code block, which is stripped first.
+    
+    Args:
+        response_text: Raw LLM response content
+        provider: Model provider the response came from
+        
+    Returns:
+        Parsed JSON object
+    """
+    if provider not in JSON_MODE_PROVIDERS:
+        # Handle potential markdown code blocks (bare JSON skips the regex)
+        fence_start = response_text.find("```")
+        if fence_start != -1:
+            match = _JSON_FENCE_RE.search(response_text, fence_start)
+            if match:
+                response_text = match.group(1)
+    
+    # orjson skips surrounding whitespace itself, and its JSONDecodeError
+    # subclasses json.JSONDecodeError, so callers catch either
+    return orjson.loads(response_text)
+
+
+def _response_cache_key(name: str, prompt: Tuple[str, str]) -> Tuple[str, bytes]:
+    """Key for _RESPONSE_CACHE: trait name plus a digest of the full prompt."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in prompt:
+        digest.update(part.encode())
+    return name, digest.digest()
+
+
+def _get_cached_response(cache_key: Tuple[str, bytes]) -> Optional[str]:
+    """Return a cached raw response (marking it most recently used), or None."""
+    response_text = _RESPONSE_CACHE.get(cache_key)
+    if response_text is not None:
+        _RESPONSE_CACHE.move_to_end(cache_key)
+    return response_text
+
+
+def _cache_response(cache_key: Tuple[str, bytes], response_text: str) -> None:
+    """Store a successfully parsed raw response, evicting the least recently used."""
+    _RESPONSE_CACHE[cache_key] = response_text
+    _RESPONSE_CACHE.move_to_end(cache_key)
+    while len(_RESPONSE_CACHE) > _RESPONSE_CACHE_SIZE:
+        _RESPONSE_CACHE.popitem(last=False)
+
+
+async def _invoke_with_cache(
+    name: str,
+    prompt: Tuple[str, str],
+    model: Any,
+    provider: str
+) -> Tuple[str, Tuple[str, bytes], bool]:
+    """
+    Get the raw response for a prompt, skipping the LLM call on an exact cache hit.
+    
+    Returns:
+        Tuple of (response_text, cache_key, was_cached)
+    """
+    cache_key = _response_cache_key(name, prompt)
+    response_text = _get_cached_response(cache_key)
+    if response_text is not None:
+        logger.info(f"Reusing cached {name} response (identical prompt)")
+        return response_text, cache_key, True
+    
+    response = await model.ainvoke([build_prompt_message(*prompt, provider)])
+    return response.content, cache_key, False
+
+
+async def analyze_single_trait(
+    trait: str,
+    prompt: Tuple[str, str],
+    model: Any,
+    provider: str = ""
 ) -> tuple[Dict[str, Dict[str, Any]], str]:
     """
     Analyze a single Big5 trait for specified users in conversation.
     
     Args:
         trait: Trait name (e.g., "openness")
-        conversation: Formatted conversation string
-        model_name: LLM model name
-        temperature: Model temperature
-        provider: Model provider
-        constraints: Constraints string to inject into prompt
-        existing_analysis_str: Previous analysis for this trait (for iterative updates)
+        prompt: (prefix, body) pair from build_trait_prompts
+        model: Chat model instance (shared across traits)
+        provider: Model provider (used to mark the cacheable prompt prefix)
         
     Returns:
         Tuple of (Dict mapping username -> {score, confidence, justification, changed?, change_reason?}, raw_llm_output)
     """
     raw_output = ""
     try:
-        # Load prompt template
-        prompt_template = load_prompt(f"supervisor_graph/component_C/{trait}.txt")
-        prompt = prompt_template.replace("{{CONVERSATION}}", conversation)
-        prompt = prompt.replace("{{CONSTRAINTS}}", constraints)
-        prompt = prompt.replace("{{EXISTING_ANALYSIS}}", existing_analysis_str)
-        
-        # Initialize model
-        model = init_chat_model(
-            model=model_name,
-            model_provider=provider,
-            temperature=temperature
-        )
-        
-        # Call LLM
-        response = model.invoke([HumanMessage(content=prompt)])
-        response_text = response.content
+        # Call LLM (or reuse the response to an identical prompt)
+        response_text, cache_key, was_cached = await _invoke_with_cache(trait, prompt, model, provider)
         raw_output = response_text  # Store raw output before parsing
         
-        # Parse JSON response
-        # Handle potential markdown code blocks
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0]
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0]
-        
-        result = json.loads(response_text.strip())
+        # Parse JSON response (parsed fresh each time - callers mutate the result)
+        result = parse_llm_json(response_text, provider)
+        if not was_cached:
+            _cache_response(cache_key, response_text)
         
         logger.info(f"Successfully analyzed {trait} for {len(result)} users")
         return result, raw_output
@@ -485,6 +800,160 @@ def analyze_single_trait(
         return {}, raw_output
 
 
+async def analyze_all_traits(
+    prompt: Tuple[str, str],
+    model: Any,
+    provider: str = ""
+) -> tuple[Optional[Dict[str, Dict[str, Dict[str, Any]]]], str]:
+    """
+    Analyze all 5 Big5 traits in a single LLM call.
+    
+    The conversation and constraints are sent once instead of once per trait.
+    
+    Args:
+        prompt: (prefix, body) pair for "all_traits" from build_trait_prompts
+        model: Chat model instance
+        provider: Model provider (used to mark the cacheable prompt prefix)
+        
+    Returns:
+        Tuple of (Dict mapping trait -> username -> {score, confidence, justification, ...}, raw_llm_output).
+        The dict is None if the response was not a valid JSON object, so the
+        caller can fall back to per-trait calls.
+    """
+    raw_output = ""
+    try:
+        response_text, cache_key, was_cached = await _invoke_with_cache("all_traits", prompt, model, provider)
+        raw_output = response_text
+        
+        parsed = parse_llm_json(response_text, provider)
+        if not isinstance(parsed, dict):
+            logger.error(f"Batched trait analysis returned {type(parsed).__name__}, expected a JSON object")
+            return None, raw_output
+        results = {trait: parsed.get(trait) or {} for trait in BIG5_TRAITS}
+        # Cache only responses that passed validation
+        if not was_cached:
+            _cache_response(cache_key, response_text)
+        
+        missing = [trait for trait in BIG5_TRAITS if trait not in parsed]
+        if missing:
+            logger.warning(f"Batched analysis missing traits: {missing}")
+        logger.info(f"Successfully analyzed all traits in one call ({len(BIG5_TRAITS) - len(missing)}/{len(BIG5_TRAITS)} traits)")
+        return results, raw_output
+        
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse JSON for batched trait analysis: {e}")
+        logger.error(f"Response was: {raw_output[:500]}...")
+        return None, raw_output
+    except Exception as e:
+        logger.error(f"Error in batched trait analysis: {e}")
+        return {trait: {} for trait in BIG5_TRAITS}, raw_output
+
+
+async def _with_timeout(coro, label: str, timeout: float = LLM_TIMEOUT_SECONDS) -> tuple[Any, str]:
+    """
+    Await an analysis coroutine, converting timeouts/errors into an empty result.
+    
+    Each call gets its own timeout, so one slow trait never delays the others.
+    """
+    try:
+        return await asyncio.wait_for(coro, timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.error(f"Timeout for {label}")
+        return {}, "Error: timeout"
+    except Exception as e:
+        logger.error(f"Error for {label}: {e}")
+        return {}, f"Error: {e}"
+
+
+async def _run_per_trait_async(
+    prompts: Dict[str, Tuple[str, str]],
+    model: Any,
+    provider: str
+) -> tuple[Dict[str, Dict[str, Dict[str, Any]]], Dict[str, str]]:
+    """Run the 5 per-trait LLM calls concurrently."""
+    outputs = await asyncio.gather(*[
+        _with_timeout(
+            analyze_single_trait(trait, prompts[trait], model, provider),
+            trait
+        )
+        for trait in BIG5_TRAITS
+    ], return_exceptions=True)
+    
+    # One failed trait (e.g. cancellation) must not discard the other four
+    results, raw_outputs = {}, {}
+    for trait, output in zip(BIG5_TRAITS, outputs):
+        if isinstance(output, BaseException):
+            logger.error(f"Error for {trait}: {output!r}")
+            output = ({}, f"Error: {output!r}")
+        results[trait], raw_outputs[trait] = output
+    return results, raw_outputs
+
+
+async def _run_trait_analysis_async(
+    prompts: Dict[str, Tuple[str, str]],
+    model: Any,
+    provider: str,
+    build_fallback_prompts: Optional[Callable[[], Dict[str, Tuple[str, str]]]] = None
+) -> tuple[Dict[str, Dict[str, Dict[str, Any]]], Dict[str, str]]:
+    """
+    Run the trait analysis LLM calls concurrently on a single event loop.
+    
+    In batched mode, if the response is not valid JSON, the per-trait prompts
+    from build_fallback_prompts are run instead, on the same loop.
+    """
+    if "all_traits" not in prompts:
+        return await _run_per_trait_async(prompts, model, provider)
+    
+    # Batched mode: one call covering all traits
+    results, raw_output = await _with_timeout(
+        analyze_all_traits(prompts["all_traits"], model, provider),
+        "batched trait analysis"
+    )
+    if results is not None:
+        results = {trait: results.get(trait, {}) for trait in BIG5_TRAITS}
+        return results, {trait: raw_output for trait in BIG5_TRAITS}
+    
+    if build_fallback_prompts is None:
+        return {trait: {} for trait in BIG5_TRAITS}, {trait: raw_output for trait in BIG5_TRAITS}
+    
+    logger.warning("Batched trait analysis did not return a JSON object, falling back to per-trait calls")
+    return await _run_per_trait_async(build_fallback_prompts(), model, provider)
+
+
+def _run_on_llm_loop(coro) -> Any:
+    """Run a coroutine on the shared LLM event loop (started on first use) and wait for the result."""
+    global _LLM_LOOP
+    with _LLM_LOOP_LOCK:
+        if _LLM_LOOP is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="component-c-llm-loop", daemon=True).start()
+            _LLM_LOOP = loop
+    return asyncio.run_coroutine_threadsafe(coro, _LLM_LOOP).result()
+
+
+@lru_cache(maxsize=8)
+def _get_model(model_name: str, provider: str, temperature: float) -> Any:
+    """
+    Get a chat model instance, created once per (model, provider, temperature).
+    
+    Reusing the instance keeps the provider client (and its connection pool)
+    alive between supervisor ticks. This is only safe because every async call
+    runs on the persistent _LLM_LOOP (see _run_on_llm_loop): the async HTTP
+    client is bound to the loop it first ran on, so the model must never be
+    awaited from a per-run asyncio.run loop.
+    """
+    model_kwargs = {}
+    if provider in JSON_MODE_PROVIDERS:
+        # Provider-enforced JSON output (no markdown fences to strip)
+        model_kwargs["model_kwargs"] = {"response_format": {"type": "json_object"}}
+    return init_chat_model(
+        model=model_name,
+        model_provider=provider,
+        temperature=temperature,
+        **model_kwargs
+    )
+
+
 def run_parallel_trait_analysis(
     conversation: str,
     model_name: str,
@@ -493,11 +962,17 @@ def run_parallel_trait_analysis(
     constraints: str = "",
     existing_analysis: Dict[str, Dict[str, Any]] = None,
     users_to_analyze: List[str] = None,
-    state: Dict[str, Any] = None
+    state: Dict[str, Any] = None,
+    prompts: Dict[str, Tuple[str, str]] = None
 ) -> tuple[Dict[str, Dict[str, Dict[str, Any]]], Dict[str, str]]:
     """
     Run all 5 Big5 trait analyses in parallel.
     
+    The LLM calls are issued with ainvoke and awaited together via asyncio.gather
+    on the shared LLM event loop, so this blocks for roughly the slowest single
+    call. In batched mode a single call covers all traits; if its response is not
+    valid JSON the per-trait calls are made instead, on the same loop.
+    
     Args:
         conversation: Formatted conversation string
         model_name: LLM model name
@@ -507,48 +982,32 @@ def run_parallel_trait_analysis(
         existing_analysis: Dict mapping display_name -> {trait -> {score, justification}}
         users_to_analyze: List of display names being analyzed
         state: SupervisorState for logging
+        prompts: Prebuilt output of build_trait_prompts (built from the other
+                 arguments if None)
         
     Returns:
         Tuple of (Dict mapping trait -> username -> {score, confidence, justification, changed?, change_reason?}, Dict mapping trait -> raw_llm_output)
     """
-    results = {}
-    raw_outputs = {}
-    existing_analysis = existing_analysis or {}
-    users_to_analyze = users_to_analyze or []
+    if prompts is None:
+        existing_analysis_strs = build_existing_analysis_strings(existing_analysis or {}, users_to_analyze or [])
+        prompts = build_trait_prompts(conversation, constraints, existing_analysis_strs)
     
-    # Use ThreadPoolExecutor for parallel execution
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        futures = {}
-        for trait in BIG5_TRAITS:
-            # Build existing analysis string for this specific trait
-            existing_analysis_str = build_existing_analysis_string(
-                trait, existing_analysis, users_to_analyze
-            )
-            
-            future = executor.submit(
-                analyze_single_trait,
-                trait,
-                conversation,
-                model_name,
-                temperature,
-                provider,
-                constraints,
-                existing_analysis_str
-            )
-            futures[trait] = future
-        
-        # Collect results
-        for trait, future in futures.items():
-            try:
-                parsed_result, raw_output = future.result(timeout=60)
-                results[trait] = parsed_result
-                raw_outputs[trait] = raw_output
-            except Exception as e:
-                logger.error(f"Timeout or error for {trait}: {e}")
-                results[trait] = {}
-                raw_outputs[trait] = f"Error: {e}"
+    # Shared across all trait calls and across supervisor ticks
+    try:
+        model = _get_model(model_name, provider, temperature)
+    except Exception as e:
+        # e.g. missing API key or unknown provider - report empty results instead of failing the graph
+        logger.error(f"Failed to initialize model {provider}/{model_name}: {e}")
+        return {trait: {} for trait in BIG5_TRAITS}, {trait: f"Error: {e}" for trait in BIG5_TRAITS}
+    
+    def build_fallback_prompts() -> Dict[str, Tuple[str, str]]:
+        existing_analysis_strs = {
+            trait: build_existing_analysis_string(trait, existing_analysis or {}, users_to_analyze or [])
+            for trait in BIG5_TRAITS
+        }
+        return build_trait_prompts(conversation, constraints, existing_analysis_strs)
     
-    return results, raw_outputs
+    return _run_on_llm_loop(_run_trait_analysis_async(prompts, model, provider, build_fallback_prompts))
 
 
 def merge_trait_results_by_user(
@@ -564,18 +1023,13 @@ def merge_trait_results_by_user(
     Returns:
         Dict mapping username -> trait -> {score, confidence, justification}
     """
-    import re
     user_results = {}
     
     for trait, user_scores in trait_results.items():
         for username, data in user_scores.items():
             # Clean username: remove annotations like (Agent), (YOU), etc.
-            clean_username = re.sub(r'\s*\([^)]*\)\s*', '', username).strip()
-            username_lower = clean_username.lower()
-            
-            if username_lower not in user_results:
-                user_results[username_lower] = {}
-            user_results[username_lower][trait] = data
+            username_lower = _USERNAME_ANNOTATION_RE.sub('', username).strip().lower()
+            user_results.setdefault(username_lower, {})[trait] = data
     
     return user_results
 
@@ -589,7 +1043,7 @@ def personality_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
     Flow:
     1. Build username->user_id mapping and message counts from recent_messages
     2. Format conversation for prompts
-    3. Run 5 parallel API calls (one per trait)
+    3. Run trait analysis (one batched call, or 5 parallel calls one per trait)
     4. Filter results:
        - Skip agents
        - Skip users already confident enough (if stop_reanalysis_when_confident=True)
@@ -620,33 +1074,43 @@ def personality_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
     # Initialize participants in memory if needed
     init_result = initialize_participants(chat_id, verbose=False)
     
-    # Build mappings
-    username_to_userid = build_username_userid_mapping(recent_messages)
-    user_message_counts = count_user_messages(recent_messages)
+    # Extract per-message fields once, then build mappings from them
     agent_personas = load_agent_personas()
+    agent_identity = build_agent_identity_sets(agent_personas)
+    preprocessed = _preprocess_messages(recent_messages, agent_personas)
+    username_to_userid = build_username_userid_mapping(recent_messages, preprocessed)
     
     # Get agent display names (with "(Agent)" suffix) for constraints
     agent_display_names = get_agent_display_names(include_agent_suffix=True)
     
     # Identify users with NEW (unprocessed) messages
     # Includes cold start check against persistent storage
-    new_user_ids, new_user_mapping = identify_users_with_new_messages(recent_messages, agent_personas, chat_id)
+    new_user_ids, new_user_mapping = identify_users_with_new_messages(
+        recent_messages, agent_personas, chat_id, preprocessed
+    )
     
     logger.info(f"Found {len(username_to_userid)} unique users in recent messages")
     logger.info(f"Users with new messages: {list(new_user_mapping.keys())}")
     
+    # Load all participant files once for this run
+    participants_cache = get_all_participants_data(
+        chat_id, set(username_to_userid.values()) | set(new_user_mapping.values())
+    )
+    
     # Filter out users who are already confident enough
     users_to_analyze = []
     for display_name, user_id in new_user_mapping.items():
-        is_confident, existing_analysis = is_user_confident_enough(
-            chat_id, user_id, CONFIDENCE_THRESHOLDS
-        )
-        if STOP_REANALYSIS_WHEN_CONFIDENT and is_confident:
-            # Already confident, load existing data to cache
-            personality_cache[user_id] = existing_analysis
-            logger.debug(f"Skipping {display_name}: already confident enough")
-        else:
-            users_to_analyze.append(display_name)
+        # Confidence only matters when re-analysis of confident users is disabled
+        if STOP_REANALYSIS_WHEN_CONFIDENT:
+            is_confident, existing_analysis = is_user_confident_enough(
+                chat_id, user_id, CONFIDENCE_THRESHOLDS, participants_cache
+            )
+            if is_confident:
+                # Already confident, load existing data to cache
+                personality_cache[user_id] = existing_analysis
+                logger.debug(f"Skipping {display_name}: already confident enough")
+                continue
+        users_to_analyze.append(display_name)
     
     # Early exit if no users need analysis
     if not users_to_analyze:
@@ -656,21 +1120,22 @@ def personality_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
         for username_lower, user_id in username_to_userid.items():
             if user_id not in personality_cache:
                 # Skip agents
-                if is_agent_sender(display_name=username_lower, agent_personas=agent_personas):
+                if is_agent_identity(agent_identity, display_name=username_lower):
                     continue
                 # Load from disk
-                _, existing_analysis = is_user_confident_enough(chat_id, user_id, CONFIDENCE_THRESHOLDS)
+                _, existing_analysis = is_user_confident_enough(
+                    chat_id, user_id, CONFIDENCE_THRESHOLDS, participants_cache
+                )
                 if existing_analysis:
                     personality_cache[user_id] = existing_analysis
                     logger.debug(f"Loaded existing personality for {username_lower} from disk")
         
-        # Update messages with personality data
-        updated_messages = []
-        for msg in recent_messages:
+        # Annotate the kept messages with personality data in place
+        trimmed_messages = recent_messages[:MAX_RECENT_MESSAGES]
+        for msg in trimmed_messages:
             sender_id = str(msg.get("sender_id", "")).strip()
-            if sender_id and sender_id in personality_cache:
+            if sender_id in personality_cache:
                 msg['sender_personality'] = personality_cache[sender_id]
-            updated_messages.append(msg)
         
         log_node_output("component_c", {
             "users_analyzed": 0,
@@ -681,7 +1146,7 @@ def personality_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
         
         return {
             'personality_analysis': personality_cache,
-            'recent_messages': updated_messages[:MAX_RECENT_MESSAGES]
+            'recent_messages': trimmed_messages
         }
     
     logger.info(f"Users to analyze: {users_to_analyze}")
@@ -691,11 +1156,11 @@ def personality_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
     
     # Get existing analysis for users being analyzed (for iterative updates)
     users_to_analyze_mapping = {name: new_user_mapping[name] for name in users_to_analyze if name in new_user_mapping}
-    existing_analysis = get_existing_analysis_for_users(chat_id, users_to_analyze_mapping)
+    existing_analysis = get_existing_analysis_for_users(chat_id, users_to_analyze_mapping, participants_cache)
     logger.info(f"Users with prior analysis: {list(existing_analysis.keys())}")
     
     # Format conversation for prompt
-    conversation = format_conversation_for_prompt(recent_messages)
+    conversation = format_conversation_for_prompt(recent_messages, preprocessed)
     
     # Get model settings
     model_settings = get_model_settings('component_C', 'COMPONENT_C_MODEL')
@@ -703,22 +1168,18 @@ def personality_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
     temperature = model_settings['temperature']
     provider = model_settings['provider']
     
-    # Generate and log prompts for all traits (with constraints and existing analysis)
-    prompts = {}
-    for trait in BIG5_TRAITS:
-        try:
-            prompt_template = load_prompt(f"supervisor_graph/component_C/{trait}.txt")
-            prompt = prompt_template.replace("{{CONVERSATION}}", conversation)
-            prompt = prompt.replace("{{CONSTRAINTS}}", constraints)
-            existing_analysis_str = build_existing_analysis_string(trait, existing_analysis, users_to_analyze)
-            prompt = prompt.replace("{{EXISTING_ANALYSIS}}", existing_analysis_str)
-            prompts[trait] = prompt
-        except Exception as e:
-            logger.error(f"Failed to generate prompt for {trait}: {e}")
-            prompts[trait] = f"Error generating prompt: {e}"
-            
+    # Build prompts once (used for both logging and the LLM calls)
+    existing_analysis_strs = build_existing_analysis_strings(existing_analysis, users_to_analyze)
+    prompts = build_trait_prompts(conversation, constraints, existing_analysis_strs)
+    
     # Log all prompts in one entry
-    log_prompt("component_c", prompts, model=model_name, temperature=temperature, supervisor_state=state)
+    log_prompt(
+        "component_c",
+        {name: prefix + body for name, (prefix, body) in prompts.items()},
+        model=model_name,
+        temperature=temperature,
+        supervisor_state=state
+    )
     
     # Run parallel trait analysis
     trait_results, raw_llm_outputs = run_parallel_trait_analysis(
@@ -729,7 +1190,8 @@ def personality_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
         constraints,
         existing_analysis,
         users_to_analyze,
-        state
+        state,
+        prompts
     )
     
     # Merge results by user
@@ -740,43 +1202,40 @@ def personality_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
     # Process and save results for users that were analyzed
     saved_count = 0
     skipped_low_messages = 0
+    pending_saves = {}  # user_id -> (username_lower, complete_big5)
+    
+    # Cumulative message counts for all users from one pass over group history
+    message_counts = get_participant_message_counts(chat_id)
+    
+    # username_to_userid is already keyed by lowercase display name
+    new_user_mapping_lower = {name.lower(): uid for name, uid in new_user_mapping.items()}
     
     for username_lower, big5_data in user_results.items():
         # Find the user_id for this username
-        user_id = None
-        for name, uid in username_to_userid.items():
-            if name.lower() == username_lower:
-                user_id = uid
-                break
-        
-        if not user_id:
-            # Also check new_user_mapping
-            for name, uid in new_user_mapping.items():
-                if name.lower() == username_lower:
-                    user_id = uid
-                    break
+        user_id = username_to_userid.get(username_lower) or new_user_mapping_lower.get(username_lower)
         
         if not user_id:
             logger.warning(f"Could not find user_id for {username_lower}")
             continue
         
         # Get cumulative message count from disk (for both MIN check and penalty)
-        cumulative_messages = get_participant_messages(chat_id, user_id)
-        cumulative_msg_count = len(cumulative_messages)
+        cumulative_msg_count = message_counts.get(user_id, 0)
         
         # Check message count constraints for SAVING new data (use cumulative count)
         if cumulative_msg_count < MIN_MESSAGES_FOR_ANALYSIS:
             logger.debug(f"Skipping {username_lower}: only {cumulative_msg_count} messages (min: {MIN_MESSAGES_FOR_ANALYSIS})")
             skipped_low_messages += 1
             # Load existing data if available
-            _, existing_analysis = is_user_confident_enough(chat_id, user_id, CONFIDENCE_THRESHOLDS)
+            _, existing_analysis = is_user_confident_enough(
+                chat_id, user_id, CONFIDENCE_THRESHOLDS, participants_cache
+            )
             if existing_analysis:
                 personality_cache[user_id] = existing_analysis
             continue
         
         # Ensure all 5 traits have data: preserve previous snapshot for failed traits
         complete_big5 = {}
-        participant_data = get_participant_data(chat_id, user_id)
+        participant_data = participants_cache.get(user_id)
         previous_snapshot = None
         if participant_data:
             snapshots = participant_data.get("personality_snapshots", [])
@@ -809,14 +1268,19 @@ def personality_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
             penalty_config=CONFIDENCE_PENALTY_CONFIG
         )
         
-        # Save to memory (file)
-        save_result = save_personality_analysis(
-            chat_id=chat_id,
-            user_id=user_id,
-            big5_results=complete_big5,
-            verbose=False
-        )
-        
+        # Queue save (all participant files are written in one pass below)
+        pending_saves[user_id] = (username_lower, complete_big5)
+    
+    # Save to memory (files), reusing the message counts and participant data loaded above
+    save_results = save_personality_analyses(
+        chat_id,
+        {user_id: complete_big5 for user_id, (_, complete_big5) in pending_saves.items()},
+        message_counts=message_counts,
+        participants=participants_cache
+    )
+    
+    for user_id, save_result in save_results.items():
+        username_lower, complete_big5 = pending_saves[user_id]
         if save_result.get("success"):
             saved_count += 1
             # Update cache with the saved results (includes confidence penalty)
@@ -832,22 +1296,22 @@ def personality_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
     for username_lower, user_id in username_to_userid.items():
         if user_id not in personality_cache:
             # Skip agents
-            if is_agent_sender(display_name=username_lower, agent_personas=agent_personas):
+            if is_agent_identity(agent_identity, display_name=username_lower):
                 continue
-            # Load from disk
-            _, existing_analysis = is_user_confident_enough(chat_id, user_id, CONFIDENCE_THRESHOLDS)
+            # Load from preloaded participant data
+            _, existing_analysis = is_user_confident_enough(
+                chat_id, user_id, CONFIDENCE_THRESHOLDS, participants_cache
+            )
             if existing_analysis:
                 personality_cache[user_id] = existing_analysis
     
-    # Update recent_messages with personality data
-    updated_messages = []
-    updated_count = 0
-    for msg in recent_messages:
+    # Trim recent_messages to configured maximum (keep newest) and annotate
+    # the kept messages with personality data in place
+    trimmed_messages = recent_messages[:MAX_RECENT_MESSAGES]
+    for msg in trimmed_messages:
         sender_id = str(msg.get("sender_id", "")).strip()
-        if sender_id and sender_id in personality_cache:
+        if sender_id in personality_cache:
             msg['sender_personality'] = personality_cache[sender_id]
-            updated_count += 1
-        updated_messages.append(msg)
     
     # Log summary with raw LLM outputs per trait
     log_node_output("component_c", {
@@ -864,9 +1328,6 @@ def personality_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
         }
     }, supervisor_state=state)
     
-    # Trim recent_messages to configured maximum (keep newest)
-    trimmed_messages = updated_messages[:MAX_RECENT_MESSAGES]
-    
     # Save max message ID for cold start recovery (after all analysis complete)
     if recent_messages:
         # Convert message_id to int (it's stored as string in messages)
@@ -1,32 +1,159 @@
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple
+import httpx
 from logs.logfire_config import get_logger
 from logs import log_node_start
 # from nodes.supervisor.scheduler import get_ready_actions, mark_action_sent
 from nodes.supervisor.scheduler import get_ready_actions
-import sys
-from pathlib import Path
-sys.path.append(str(Path(__file__).parent.parent.parent))
-from telegram_exm import *
+from telegram_exm import (
+    send_telegram_message_async,
+    show_typing_indicator_async,
+    add_reaction_to_message_async
+)
 from utils import get_most_recent_message_timestamp, convert_timestamp_to_iso
 from memory import save_action
-import time
 from datetime import datetime, timezone
 
 logger = get_logger(__name__)
 
+# Connection pool bounds for the per-run Telegram client
+TELEGRAM_HTTP_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20)
+
+# Messages shorter than this are sent without a typing indicator and wait
+MIN_TYPING_CHARS = 20
+
 
 def calculate_typing_duration(content: str) -> int:
     # Base calculation: ~100ms per character, but with bounds
     # Average reading/typing speed: about 10-15 chars per second
     char_count = len(content)
     
-    # Calculate duration: 100ms per character
-    duration = char_count * 100
+    # 100ms per character, clamped between 2 seconds (2000ms) and 8 seconds (8000ms)
+    return max(2000, min(8000, char_count * 100))
+
+
+def resolve_reply_timestamp(action: Dict[str, Any], most_recent_timestamp: Optional[str]) -> Optional[str]:
+    """
+    Get the ISO timestamp to reply/react to for an action.
+    
+    Only use reply if target message is NOT the most recent message (unless it's a reaction).
+    
+    Args:
+        action: Ready action from the execution queue
+        most_recent_timestamp: Timestamp of the newest message in recent_messages
+        
+    Returns:
+        ISO timestamp for the Telegram API, or None if no reply should be used
+    """
+    target_message = action.get('target_message')
+    if not (target_message and isinstance(target_message, dict)):
+        return None
+    
+    timestamp_str = target_message.get('timestamp', '')
+    if not timestamp_str:
+        return None
+    
+    # Convert to ISO format for Telegram API (precomputed by the scheduler when available)
+    reply_timestamp = action.get('reply_iso_timestamp') or convert_timestamp_to_iso(timestamp_str)
+    
+    if not reply_timestamp:
+        logger.warning("Failed to convert timestamp '%s'", timestamp_str)
+        return None
+    
+    # For reactions, we always need the timestamp
+    # For regular messages, only use reply if target is not the most recent
+    if action.get('action_id') != "add_reaction":
+        if timestamp_str == most_recent_timestamp:
+            logger.info("Target message is the most recent - skipping reply (no need to quote)")
+            return None
+        logger.info("Target message is older - using reply: %s -> %s", timestamp_str, reply_timestamp)
+    else:
+        logger.info("Reaction target: %s -> %s", timestamp_str, reply_timestamp)
+    
+    return reply_timestamp
+
+
+async def execute_action(
+    client: httpx.AsyncClient,
+    action: Dict[str, Any],
+    chat_id: str,
+    reply_timestamp: Optional[str]
+) -> Dict[str, Any]:
+    """
+    Send one action to Telegram (reaction, or typing indicator + message).
+    
+    Returns:
+        JSON response from Telegram API
+    """
+    action_content = action.get('action_content', '')
+    phone_number = action.get('phone_number', '')
+    
+    # Route based on action_id
+    if action.get('action_id') == "add_reaction":
+        # For reactions, action_content contains the emoji
+        emoji = action_content.strip()
+        return await add_reaction_to_message_async(client, phone_number, chat_id, reply_timestamp, emoji)
+    
+    # For all other actions, show typing indicator first (short messages skip it)
+    if len(action_content) >= MIN_TYPING_CHARS:
+        typing_duration = calculate_typing_duration(action_content)
+        try:
+            await show_typing_indicator_async(client, phone_number, chat_id, typing_duration)
+            # Wait for typing indicator to complete
+            await asyncio.sleep(typing_duration / 750)  # Slightly less than duration to account for processing time
+        except Exception as e:
+            logger.warning("Failed to show typing indicator: %s", e)
+    
+    # Now send the actual message
+    return await send_telegram_message_async(
+        client,
+        phone_number,
+        chat_id,
+        action_content,
+        reply_to_timestamp=reply_timestamp  # Use if available, None otherwise
+    )
+
+
+async def execute_actions_concurrently(
+    prepared_actions: List[Tuple[Dict[str, Any], Optional[str]]],
+    chat_id: str
+) -> List[Any]:
+    """
+    Execute actions concurrently across agents while keeping each agent's actions sequential.
+    
+    Actions from the same phone number are sent in queue order with a short delay
+    between them; different phone numbers are independent Telegram sessions and
+    run in parallel.
+    
+    Args:
+        prepared_actions: List of (action, reply_timestamp) in queue order
+        chat_id: Telegram chat ID
+        
+    Returns:
+        Response (or raised exception) per action, in the order of prepared_actions
+    """
+    by_phone: Dict[str, List[int]] = {}
+    for index, (action, _) in enumerate(prepared_actions):
+        by_phone.setdefault(action['phone_number'], []).append(index)
+    
+    responses: List[Any] = [None] * len(prepared_actions)
     
-    # Clamp between 2 seconds (2000ms) and 8 seconds (8000ms)
-    duration = max(2000, min(8000, duration))
+    async def run_phone_actions(indices: List[int]) -> None:
+        for position, index in enumerate(indices):
+            if position:
+                await asyncio.sleep(2)  # Short delay between actions of the same agent
+            action, reply_timestamp = prepared_actions[index]
+            try:
+                responses[index] = await execute_action(client, action, chat_id, reply_timestamp)
+            except Exception as e:
+                responses[index] = e
     
-    return duration
+    # One client per run: httpx async clients are bound to the event loop that
+    # created them, and each executor run drives its own loop with asyncio.run
+    async with httpx.AsyncClient(limits=TELEGRAM_HTTP_LIMITS) as client:
+        await asyncio.gather(*(run_phone_actions(indices) for indices in by_phone.values()))
+    
+    return responses
 
 
 def executor_node(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -71,7 +198,7 @@ def executor_node(state: Dict[str, Any]) -> Dict[str, Any]:
         logger.info("Executor: No ready actions in queue")
         return {}
     
-    logger.info(f"Executor: Executing {len(ready_actions)} actions", supervisor_state=state)
+    logger.info("Executor: Executing %d actions", len(ready_actions), supervisor_state=state)
     
     # Track successful executions for timestamp updates
     executed_agents = []
@@ -79,148 +206,77 @@ def executor_node(state: Dict[str, Any]) -> Dict[str, Any]:
     # Get group name for action logging
     group_name = group_metadata.get('name', 'Unknown Group')
     
-    # Execute each action
-    executed_count = 0
+    # Validate actions and resolve reply timestamps before sending anything
+    prepared_actions = []
     for action in ready_actions:
         agent_name = action.get('agent_name', 'unknown')
         action_id = action.get('action_id', 'unknown')
-        action_content = action.get('action_content', '')
-        phone_number = action.get('phone_number', '')
-        target_message = action.get('target_message')
         
-        # Get trigger info for action logging
-        trigger_id = action.get('trigger_id', 'unknown')
-        trigger_justification = action.get('trigger_justification', '')
-        action_purpose = action.get('action_purpose', '')
+        if not action.get('phone_number', ''):
+            logger.error("No phone number for agent %s", agent_name)
+            continue
         
-        # Extract triggered_by_msg and msg_id from target_message
-        triggered_by_msg = ''
-        triggered_by_msg_id = ''
-        if target_message and isinstance(target_message, dict):
-            triggered_by_msg = target_message.get('text', '')
-            triggered_by_msg_id = str(target_message.get('message_id', ''))
+        if not action.get('action_content', ''):
+            logger.error("No message content for action from %s", agent_name)
+            continue
         
-        logger.info(f"Executing action '{action_id}' from {agent_name}")
+        reply_timestamp = resolve_reply_timestamp(action, most_recent_timestamp)
         
-        if not phone_number:
-            logger.error(f"No phone number for agent {agent_name}")
+        if action_id == "add_reaction" and not reply_timestamp:
+            logger.error("add_reaction action requires target_message with timestamp, but none provided")
             continue
         
-        if not action_content:
-            logger.error(f"No message content for action from {agent_name}")
+        prepared_actions.append((action, reply_timestamp))
+    
+    # Send to Telegram - different agents concurrently, each agent's actions in order
+    responses = asyncio.run(execute_actions_concurrently(prepared_actions, chat_id))
+    
+    # Record results in queue order
+    executed_count = 0
+    for (action, reply_timestamp), response in zip(prepared_actions, responses):
+        agent_name = action.get('agent_name', 'unknown')
+        action_id = action.get('action_id', 'unknown')
+        action_content = action.get('action_content', '')
+        is_reaction = action_id == "add_reaction"
+        
+        if isinstance(response, BaseException):
+            response = {"success": False, "error": str(response)}
+        
+        if not (response and response.get("success")):
+            failed = "add reaction" if is_reaction else "send message"
+            logger.error("ERROR: Failed to %s from %s: %s", failed, agent_name, (response or {}).get('error', 'Unknown error'))
             continue
         
-        # Convert timestamp and determine if we should use reply
-        # Only use reply if target message is NOT the most recent message (unless it's a reaction)
-        reply_timestamp = None
-        if target_message and isinstance(target_message, dict):
-            timestamp_str = target_message.get('timestamp', '')
-            if timestamp_str:
-                # Convert to ISO format for Telegram API
-                reply_timestamp = convert_timestamp_to_iso(timestamp_str)
-                
-                if not reply_timestamp:
-                    logger.warning(f"Failed to convert timestamp '{timestamp_str}'")
-                else:
-                    # For reactions, we always need the timestamp
-                    # For regular messages, only use reply if target is not the most recent
-                    if action_id != "add_reaction":
-                        is_most_recent = (timestamp_str == most_recent_timestamp)
-                        if is_most_recent:
-                            logger.info(f"Target message is the most recent - skipping reply (no need to quote)")
-                            reply_timestamp = None
-                        else:
-                            logger.info(f"Target message is older - using reply: {timestamp_str} -> {reply_timestamp}")
-                    else:
-                        logger.info(f"Reaction target: {timestamp_str} -> {reply_timestamp}")
+        # One record per action, written after the concurrent sends finish
+        logger.info(
+            "Successfully %s from %s (%s): action=%s reply_to=%s",
+            'added reaction' if is_reaction else 'sent message', agent_name, action.get('phone_number'), action_id, reply_timestamp
+        )
+        executed_count += 1
+        executed_agents.append((agent_name, action_id))
         
-        # Route based on action_id
-        if action_id == "add_reaction":
-            # For add_reaction, use add_reaction_to_message
-            if not reply_timestamp:
-                logger.error(f"add_reaction action requires target_message with timestamp, but none provided")
-                continue
-            
-            # For reactions, action_content contains the emoji
-            emoji = action_content.strip()
-            logger.info(f"Adding reaction '{emoji}' from {agent_name} ({phone_number}) to message at {reply_timestamp}")
-            
-            response = add_reaction_to_message(
-                phone=phone_number,
-                chat_id=chat_id,
-                message_timestamp=reply_timestamp,
-                emoji=emoji
-            )
-            
-            if response and response.get("success"):
-                logger.info(f"Successfully added reaction from {agent_name}")
-                executed_count += 1
-                executed_agents.append((agent_name, action_id))
-                
-                # Log action to memory
-                save_action(
-                    chat_id=chat_id,
-                    agent_name=agent_name,
-                    group_name=group_name,
-                    trigger_detected=trigger_id,
-                    triggered_by_msg=triggered_by_msg,
-                    triggered_by_msg_id=triggered_by_msg_id,
-                    action_reason=trigger_justification,
-                    action_id=action_id,
-                    action_content=emoji
-                )
-            else:
-                logger.error(f"ERROR: Failed to add reaction from {agent_name}: {response.get('error', 'Unknown error')}")
+        # Extract triggered_by_msg and msg_id from target_message
+        target_message = action.get('target_message')
+        triggered_by_msg = ''
+        triggered_by_msg_id = ''
+        if target_message and isinstance(target_message, dict):
+            triggered_by_msg = target_message.get('text', '')
+            triggered_by_msg_id = str(target_message.get('message_id', ''))
         
-        else:
-            # For all other actions, use send_telegram_message
-            # First, show typing indicator
-            typing_duration = calculate_typing_duration(action_content)
-            # logger.info(f"Showing typing indicator from {agent_name} for {typing_duration}ms")
-            
-            try:
-                show_typing_indicator(
-                    phone=phone_number,
-                    chatId=chat_id,
-                    duration=typing_duration
-                )
-                # Wait for typing indicator to complete
-                time.sleep(typing_duration / 750)  # Slightly less than duration to account for processing time
-            except Exception as e:
-                logger.warning(f"Failed to show typing indicator: {e}")
-            
-            # Now send the actual message
-            logger.info(f"Sending message from {agent_name} ({phone_number}) to {chat_id}")
-            
-            response = send_telegram_message(
-                from_phone=phone_number,
-                to_target=chat_id,
-                content_value=action_content,
-                reply_to_timestamp=reply_timestamp  # Use if available, None otherwise
-            )
-            
-            if response and response.get("success"):
-                logger.info(f"Successfully sent message from {agent_name}")
-                executed_count += 1
-                executed_agents.append((agent_name, action_id))
-                
-                # Log action to memory
-                save_action(
-                    chat_id=chat_id,
-                    agent_name=agent_name,
-                    group_name=group_name,
-                    trigger_detected=trigger_id,
-                    triggered_by_msg=triggered_by_msg,
-                    triggered_by_msg_id=triggered_by_msg_id,
-                    action_reason=trigger_justification,
-                    action_id=action_id,
-                    action_content=action_content
-                )
-            else:
-                logger.error(f"ERROR: Failed to send message from {agent_name}: {response.get('error', 'Unknown error')}")
-        if len(ready_actions) > 1:
-            time.sleep(2)  # Short delay between actions 
-    logger.info(f"Executor: Executed {executed_count}/{len(ready_actions)} actions successfully")
+        # Log action to memory (for reactions, action_content is the emoji)
+        save_action(
+            chat_id=chat_id,
+            agent_name=agent_name,
+            group_name=group_name,
+            trigger_detected=action.get('trigger_id', 'unknown'),
+            triggered_by_msg=triggered_by_msg,
+            triggered_by_msg_id=triggered_by_msg_id,
+            action_reason=action.get('trigger_justification', ''),
+            action_id=action_id,
+            action_content=action_content.strip() if is_reaction else action_content
+        )
+    
+    logger.info("Executor: Executed %d/%d actions successfully", executed_count, len(ready_actions))
     
     # Update action_timestamp for successfully executed actions in agents_recent_actions
     # We update the records in-place since they're mutable dicts
@@ -234,7 +290,7 @@ def executor_node(state: Dict[str, Any]) -> Dict[str, Any]:
                 if (action_record.get('action_id') == action_id and 
                     action_record.get('action_timestamp') is None):
                     action_record['action_timestamp'] = execution_timestamp
-                    logger.info(f"Updated action_timestamp for {agent_name}'s action {action_id}")
+                    logger.info("Updated action_timestamp for %s's action %s", agent_name, action_id)
                     break
     
     return {
@@ -8,12 +8,16 @@ Responsibilities:
 4. Maintain in-memory queue state
 """
 from typing import Dict, Any, List
+from utils import convert_timestamp_to_iso
 from logs.logfire_config import get_logger
 from logs import log_node_start
 
 # Configure logging
 logger = get_logger(__name__)
 
+# Statuses that never produce a queue item (missing status included)
+_SKIP_STATUSES = frozenset({'no_action_needed', None, ''})
+
 
 # Scheduler Node - Takes selected_actions from the supervisor's state and builds execution_queue.
 def scheduler_node(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -23,12 +27,15 @@ def scheduler_node(state: Dict[str, Any]) -> Dict[str, Any]:
     
     selected_actions = state.get('selected_actions', [])
     
-    # Filter out actions with no_action_needed status
-    actionable_items = []
-    for action in selected_actions:
-        status = action.get('status')
-        if status and status != 'no_action_needed':
-            actionable_items.append(action)
+    # Filter out actions with no_action_needed status (single pass)
+    actionable_items = [
+        action for action in selected_actions
+        if action.get('status') not in _SKIP_STATUSES
+    ]
+    
+    skipped_count = len(selected_actions) - len(actionable_items)
+    if skipped_count:
+        logger.debug("Scheduler: Skipped %d actions without an actionable status", skipped_count)
     
     if not actionable_items:
         logger.info("Scheduler: No actionable items to queue")
@@ -36,12 +43,12 @@ def scheduler_node(state: Dict[str, Any]) -> Dict[str, Any]:
             'execution_queue': []
         }
     
-    logger.info(f"Scheduler: Queuing {len(actionable_items)} actions", selected_actions=actionable_items, supervisor_state=state)
-    
     # Build execution queue with all necessary fields
     execution_queue = []
     for action in actionable_items:
         selected_action_data = action.get('selected_action', {})
+        target_message = selected_action_data.get('target_message')
+        target_timestamp = target_message.get('timestamp') if isinstance(target_message, dict) else None
         queue_item = {
             'agent_name': action.get('agent_name', 'unknown'),
             'agent_type': action.get('agent_type', 'unknown'),
@@ -49,13 +56,22 @@ def scheduler_node(state: Dict[str, Any]) -> Dict[str, Any]:
             'action_purpose': selected_action_data.get('purpose', ''),
             'action_content': action.get('styled_response', ''),
             'phone_number': action.get('phone_number', ''),
-            'target_message': selected_action_data.get('target_message'),  # Include target_message
+            'target_message': target_message,  # Include target_message
+            'reply_iso_timestamp': convert_timestamp_to_iso(target_timestamp) if target_timestamp else None,  # Parsed once here for the executor
             'trigger_id': selected_action_data.get('trigger_id', ''),  # Include trigger info for action logging
             'trigger_justification': selected_action_data.get('trigger_justification', ''),
             'status': 'pending'  # pending, sent
         }
         execution_queue.append(queue_item)
-        logger.info(f"Queued action from {queue_item['agent_name']}: {queue_item['action_id']}", **queue_item)
+    
+    # One summary line instead of a log call per queued action
+    logger.info(
+        "Scheduler: Queued %d actions: %s",
+        len(execution_queue),
+        ", ".join(f"{item['agent_name']}:{item['action_id']}" for item in execution_queue),
+        selected_actions=actionable_items,
+        supervisor_state=state
+    )
     
     return {
         'execution_queue': execution_queue
@@ -9,7 +9,6 @@ This script:
 """
 
 import time
-import json
 import logging
 from pathlib import Path
 from datetime import datetime
@@ -22,13 +21,12 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 
 from build_graph import build_supervisor_graph
-from utils import get_all_agent_usernames, load_agent_personas, is_agent_sender
+from utils import get_all_agent_usernames, load_agent_personas, load_supervisor_config, load_json_file, build_agent_identity_sets, is_agent_identity
 from states.supervisor_state import SupervisorState
 from states.agent_state import Message
 from telegram_exm import *
 from logs.logfire_config import setup_logfire, get_logger
 from memory import save_group_messages, update_messages_emotions, get_group_messages, get_agent_actions, get_group_sentiment
-from collections import deque
 import time
 from logs.logfire_export import export_run_logs
 
@@ -37,19 +35,30 @@ setup_logfire("cultural-agents-supervisor")
 logger = get_logger(__name__)
 
 # Load configuration
-CONFIG_PATH = Path(__file__).parent / "config" / "supervisor_config.json"
-with open(CONFIG_PATH, 'r') as f:
-    CONFIG = json.load(f)
+CONFIG = load_supervisor_config()
 
 CHAT_ID = CONFIG["telegram"]["chat_id"]
 MESSAGE_CHECK_INTERVAL = CONFIG["polling"]["message_check_interval_seconds"]
 TELEGRAM_FETCH_LIMIT = CONFIG["polling"]["telegram_fetch_limit"]
 MAX_RECENT_MESSAGES = CONFIG["polling"]["max_recent_messages"]
 MAX_INITIAL_ACTIONS = CONFIG["polling"]["max_initial_actions_per_agent"]
+SEEN_MESSAGE_IDS_LIMIT = 1000
+MAX_GRAPH_ATTEMPTS = 3  # Failed graph runs before a message is given up on
 
 
-def parse_telegram_message(msg_data: dict, agent_usernames: list = None) -> Message:
-    """Parse Telegram API message into Message TypedDict."""
+def mark_message_seen(seen_message_ids: dict, message_id: str) -> None:
+    """Record a message id, discarding the oldest once SEEN_MESSAGE_IDS_LIMIT is reached."""
+    seen_message_ids[message_id] = None
+    if len(seen_message_ids) > SEEN_MESSAGE_IDS_LIMIT:
+        del seen_message_ids[next(iter(seen_message_ids))]
+
+
+def parse_telegram_message(msg_data: dict, agent_usernames: frozenset = None) -> Message:
+    """
+    Parse Telegram API message into Message TypedDict.
+    
+    agent_usernames is a set of lowercased agent usernames, built once by the caller.
+    """
     # Parse reactions if present
     reactions = None
     if msg_data.get("reactions"):
@@ -58,11 +67,10 @@ def parse_telegram_message(msg_data: dict, agent_usernames: list = None) -> Mess
             reaction = {"emoji": r.get("emoji", ""), "count": r.get("count", 0)}
             # Filter users to only include agents (match by username)
             if agent_usernames and r.get("users"):
-                agent_usernames_lower = [u.lower() for u in agent_usernames]
                 filtered_users = []
                 for u in r.get("users", []):
                     username = (u.get("username") or "").lower()
-                    if username and username in agent_usernames_lower:
+                    if username and username in agent_usernames:
                         first = (u.get("firstName", "") or "").strip()
                         last = (u.get("lastName", "") or "").strip()
                         full_name = f"{first} {last}".strip()
@@ -77,6 +85,15 @@ def parse_telegram_message(msg_data: dict, agent_usernames: list = None) -> Mess
     
     # Preserve original ISO timestamp
     original_timestamp = msg_data.get("date", "")
+    if original_timestamp:
+        # Telegram dates end in "Z"; swap only the suffix instead of scanning the string
+        if original_timestamp.endswith("Z"):
+            date = datetime.fromisoformat(original_timestamp[:-1] + "+00:00")
+        else:
+            date = datetime.fromisoformat(original_timestamp)
+    else:
+        date = datetime.now()
+        original_timestamp = date.strftime("%Y-%m-%dT%H:%M:%S.000Z")
     
     # Load existing emotion if present (from previous Component B analysis)
     existing_emotion = msg_data.get("message_emotion")
@@ -88,12 +105,13 @@ def parse_telegram_message(msg_data: dict, agent_usernames: list = None) -> Mess
         sender_first_name=msg_data.get("senderFirstName") or "",
         sender_last_name=msg_data.get("senderLastName") or "",
         text=msg_data.get("text") or "",
-        date=datetime.fromisoformat(original_timestamp.replace("Z", "+00:00")) if original_timestamp else datetime.now(),
-        timestamp=original_timestamp if original_timestamp else datetime.now().strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        date=date,
+        timestamp=original_timestamp,
         reactions=reactions,
         message_emotion=existing_emotion,
         sender_personality=None,
         processed=False,
+        attempts=0,
         replyToMessageId = msg_data.get("replyToMessageId", None)
     )
 
@@ -113,14 +131,18 @@ def run_supervisor_loop():
     agent_personas = load_agent_personas()
     logger.info(f"Loaded {len(agent_personas)} agent personas")
     
-    # Get agent usernames for filtering reaction users
-    agent_usernames = get_all_agent_usernames()
+    # Lowercase agent identifiers, built once for set-based agent-sender checks
+    agent_identity = build_agent_identity_sets(agent_personas)
+    
+    # Get agent usernames for filtering reaction users (lowercased once for set lookups)
+    agent_usernames = frozenset(u.lower() for u in get_all_agent_usernames())
     
     primary_phone = agent_personas[0].get("phone_number", None)
    
 
-    # This automatically discards the oldest IDs when we reach 1000
-    seen_message_ids = deque(maxlen=1000)
+    # Insertion-ordered dict used as a bounded set: O(1) membership checks,
+    # oldest IDs are discarded by mark_message_seen
+    seen_message_ids: dict = {}
     
     # 2. Initialize State
     # Load group_sentiment from memory if available
@@ -148,9 +170,7 @@ def run_supervisor_loop():
         # Load persona to get first_name - this matches how build_graph.py keys agents
         persona_file = agent_config.get("persona_file")
         if persona_file:
-            persona_path = Path(__file__).parent / persona_file
-            with open(persona_path, 'r') as f:
-                persona = json.load(f)
+            persona = load_json_file(Path(__file__).parent / persona_file)
             # Use first_name if available, else fallback to config name
             agent_display_name = persona.get("first_name") or agent_config.get("name", "").split()[0]
         else:
@@ -222,15 +242,15 @@ def run_supervisor_loop():
         initial_messages = [parse_telegram_message(msg, agent_usernames) for msg in messages_from_storage]
         state["recent_messages"] = initial_messages
         
-        # --- CHANGE 2: Load initial IDs into deque ---
+        # --- CHANGE 2: Load initial IDs into the seen history ---
         for msg in initial_messages:
-            seen_message_ids.append(msg["message_id"])
+            mark_message_seen(seen_message_ids, msg["message_id"])
             
         logger.info(f"Loaded {len(initial_messages)} initial messages")
         
         # Mark agent messages as processed
         for msg in state["recent_messages"]:
-            if is_agent_sender(message=msg, agent_personas=agent_personas):
+            if is_agent_identity(agent_identity, message=msg):
                 msg['processed'] = True
         
         # Check for unprocessed messages in history to react to
@@ -243,9 +263,10 @@ def run_supervisor_loop():
             # Persist emotion analysis to group_history
             update_messages_emotions(CHAT_ID, state["recent_messages"])
             
-            # Mark processed locally after run
+            # Mark processed locally after run (only messages not already marked)
             for msg in state["recent_messages"]:
-                msg['processed'] = True
+                if not msg.get('processed', False):
+                    msg['processed'] = True
             
             logger.info("Initial graph execution completed")
         else:
@@ -267,68 +288,93 @@ def run_supervisor_loop():
                 messages_data = get_chat_messages(phone=primary_phone, chat_id=CHAT_ID, limit=TELEGRAM_FETCH_LIMIT)
                 
                 if messages_data and messages_data.get("success"):
-                    # Save raw messages to memory (file system) so Component C can find participants
-                    fetched_messages_raw = messages_data.get("messages", [])
+                    # Save raw messages to memory (file system) so Component C can find participants.
+                    # Seen IDs are already in group_history, so idle polls skip the file entirely.
+                    fetched_messages_raw = [
+                        msg for msg in messages_data.get("messages", [])
+                        if str(msg.get("id")) not in seen_message_ids
+                    ]
                     if fetched_messages_raw:
                         save_group_messages(CHAT_ID, fetched_messages_raw)
                         
                     # Load messages from group_history (may have emotions from previous runs)
                     messages_from_storage = get_group_messages(CHAT_ID, limit=TELEGRAM_FETCH_LIMIT)
-                    raw_messages = [parse_telegram_message(msg, agent_usernames) for msg in messages_from_storage]
                     
                     # Log IDs for debugging
-                    all_ids = [msg["message_id"] for msg in raw_messages]
-                    logger.info(f"📥 Fetched {len(raw_messages)} messages. IDs: {all_ids}")
+                    all_ids = [str(msg.get("id")) for msg in messages_from_storage]
+                    logger.info(f"📥 Fetched {len(messages_from_storage)} messages. IDs: {all_ids}")
+                    
+                    # Skip already-seen messages before parsing (most of each poll is repeats)
+                    raw_messages = [
+                        parse_telegram_message(msg, agent_usernames)
+                        for msg in messages_from_storage
+                        if str(msg.get("id")) not in seen_message_ids
+                    ]
                     
                     # --- CHANGE 3: Simplified logic ---
-                    # Only filter based on what is NOT in our seen history (deque)
+                    # Only filter based on what is NOT in our seen history
                     # No clearing, no intersection logic.
                     new_messages = []
                     for msg in raw_messages:
                         if msg["message_id"] not in seen_message_ids:
                             new_messages.append(msg)
                             # Add to seen immediately so we don't process it again next loop
-                            seen_message_ids.append(msg["message_id"])
+                            mark_message_seen(seen_message_ids, msg["message_id"])
                     
                     if new_messages:
-                        # Prepend new messages to state
-                        state["recent_messages"] = new_messages + state["recent_messages"]
+                        # Prepend new messages to state, keeping only the newest MAX_RECENT_MESSAGES.
+                        # Component B trims too, but only on graph runs; agent-only batches skip the graph.
+                        state["recent_messages"] = (new_messages + state["recent_messages"])[:MAX_RECENT_MESSAGES]
                         logger.info(f"Found {len(new_messages)} new messages")
                         
-                        # Mark agent messages as processed
-                        for msg in state["recent_messages"]:
-                            if is_agent_sender(message=msg, agent_personas=agent_personas) and not msg.get('processed', False):
+                        # Mark agent messages as processed. Older messages were checked
+                        # when they arrived, so only the new ones need checking.
+                        for msg in new_messages:
+                            if is_agent_identity(agent_identity, message=msg):
                                 msg['processed'] = True
-                        
-                        # Process if actionable messages exist
-                        unprocessed = [msg for msg in state["recent_messages"] if not msg.get('processed', False)]
-                        
-                        if unprocessed:
-                            logger.info(f"Running graph for {len(unprocessed)} new messages")
+                    else:
+                        logger.info("No new messages found (all IDs already seen)")
+                    
+                    # Process if actionable messages exist in the window - this also retries
+                    # messages left unprocessed by a failed graph run on an earlier poll
+                    unprocessed = [msg for msg in state["recent_messages"] if not msg.get('processed', False)]
+                    
+                    if unprocessed:
+                        logger.info(f"Running graph for {len(unprocessed)} unprocessed messages")
+                        try:
                             state = graph.invoke(state)
-                            
+                        except Exception as e:
+                            # Leave the messages unprocessed so the next poll retries them,
+                            # but give up on a message after MAX_GRAPH_ATTEMPTS failed runs
+                            logger.error(f"Graph execution failed: {e}", exc_info=True)
+                            given_up = []
+                            for msg in unprocessed:
+                                msg['attempts'] = (msg.get('attempts') or 0) + 1
+                                if msg['attempts'] >= MAX_GRAPH_ATTEMPTS:
+                                    msg['processed'] = True
+                                    given_up.append(msg['message_id'])
+                            if given_up:
+                                logger.error(f"Giving up on messages after {MAX_GRAPH_ATTEMPTS} failed graph runs: {given_up}")
+                        else:
                             # Persist emotion analysis to group_history
                             update_messages_emotions(CHAT_ID, state["recent_messages"])
                             
-                            # Mark processed locally
+                            # Mark processed locally (only messages not already marked)
                             for msg in state["recent_messages"]:
-                                msg['processed'] = True
-                                
+                                if not msg.get('processed', False):
+                                    msg['processed'] = True
+                            
                             logger.info("Graph execution completed")
-                        else:
-                            logger.info("All new messages are internal/agent messages, skipping")
-                    else:
-                        logger.info("No new messages found (all IDs already seen)")
+                    elif new_messages:
+                        logger.info("All new messages are internal/agent messages, skipping")
                 
                 last_message_check = current_time
-                
-            else:
-                # Idle logging
-                if int(time_since_check) % 30 == 0 and int(time_since_check) > 0:
-                    remaining = MESSAGE_CHECK_INTERVAL - int(time_since_check)
-                    logger.info(f"Idle... Next pull in {remaining}s")
             
-            time.sleep(15)
+            # Sleep until the next pull is due instead of waking on a fixed tick
+            remaining = MESSAGE_CHECK_INTERVAL - (time.time() - last_message_check)
+            if remaining > 0:
+                logger.info(f"Idle... Next pull in {int(remaining)}s")
+                time.sleep(remaining)
 
     except KeyboardInterrupt:
         logger.info("Supervisor loop stopped by user")
@@ -1,7 +1,12 @@
 import requests
+import httpx
+import asyncio
 import os
 import json
 import logging
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -10,6 +15,18 @@ TELEGRAM_HOST = os.environ.get('TELEGRAM_HOST', 'localhost')
 TELEGRAM_PORT = os.environ.get('TELEGRAM_PORT', '4000')
 TELEGRAM_API_URL = f"http://{TELEGRAM_HOST}:{TELEGRAM_PORT}"
 
+# Shared session: keeps connections to the Telegram service alive between calls.
+# Retry only applies to idempotent methods (GET), so a POST is never sent twice.
+# 429 is left out: rate limits are handled once, by _post_respecting_retry_after.
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=50,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504])
+)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
 # Test constants (for standalone testing)
 TAMAR_NUMBER_ENCODED = "%2B37379276083"
 TAMAR_NUMBER = "+37379276083"
@@ -40,7 +57,7 @@ def send_telegram_verification_code():
       "apiHash": TAMAR_API_HASH
     }
     print('Sending verification code to:', postUrl)
-    response = requests.post(postUrl, json=payload)
+    response = _SESSION.post(postUrl, json=payload)
     print_response(response)
     return response.json()
 
@@ -51,7 +68,7 @@ def verify_telegram_code():
       "code": "12345"  # Replace with the actual code received
     }
     print('Verifying code at:', postUrl)
-    response = requests.post(postUrl, json=payload)
+    response = _SESSION.post(postUrl, json=payload)
     print_response(response)
     return response.json()
 
@@ -83,7 +100,7 @@ def get_unread_telegram_messages(account_phone=None, target_phone=None, chat_id=
     logger.info(f'Fetching unread messages from: {getUrl}')
     
     try:
-        response = requests.get(getUrl, timeout=10)
+        response = _SESSION.get(getUrl, timeout=10)
         response.raise_for_status()
         logger.info(f"Unread messages fetched successfully. Status: {response.status_code}")
         return response.json()
@@ -108,7 +125,7 @@ def get_all_chats(account_phone=None):
     logger.info(f'Fetching all chats from: {getUrl}')
     
     try:
-        response = requests.get(getUrl, timeout=10)
+        response = _SESSION.get(getUrl, timeout=10)
         response.raise_for_status()
         logger.info(f"Chats fetched successfully. Status: {response.status_code}")
         return response.json()
@@ -136,11 +153,13 @@ def get_chat_messages(phone=None, chat_id=None, limit=100):
     logger.info(f'Fetching messages from: {getUrl}')
     
     try:
-        response = requests.get(getUrl, timeout=10)
+        response = _SESSION.get(getUrl, timeout=10)
         response.raise_for_status()
-        logger.info(f"Messages fetched successfully. Count: {response.json().get('messagesCount', 0)}")
-        return response.json()
-    except requests.RequestException as e:
+        # Polled every cycle with up to `limit` messages; orjson decodes the raw bytes directly
+        data = orjson.loads(response.content)
+        logger.info(f"Messages fetched successfully. Count: {data.get('messagesCount', 0)}")
+        return data
+    except (requests.RequestException, orjson.JSONDecodeError) as e:
         logger.error(f"Error fetching chat messages: {e}")
         return {"success": False, "error": str(e)}
 
@@ -164,7 +183,7 @@ def get_all_group_participants(phone=None, chat_id=None):
     logger.info(f'Fetching all group participants from: {getUrl}')
     
     try:
-        response = requests.get(getUrl, timeout=10)
+        response = _SESSION.get(getUrl, timeout=10)
         response.raise_for_status()
         logger.info(f"Group participants fetched successfully. Status: {response.status_code}")
         return response.json()
@@ -174,6 +193,25 @@ def get_all_group_participants(phone=None, chat_id=None):
 
 # sending messages and replies
 
+def _build_send_payload(from_phone, to_target, content_value, reply_to_message_id=None, reply_to_timestamp=None):
+    """Build the /api/messages/send payload (shared by the sync and async senders)."""
+    payload = {
+        "fromPhone": from_phone,
+        "toTarget": to_target,
+        "content": {
+            "type": "text",
+            "value": content_value
+        }
+    }
+    
+    # Add reply parameters if provided
+    if reply_to_message_id:
+        payload["replyTo"] = reply_to_message_id
+    elif reply_to_timestamp:
+        payload["replyToTimestamp"] = reply_to_timestamp
+    
+    return payload
+
 def send_telegram_message(from_phone=None, to_target=None, content_value=None, reply_to_message_id=None, reply_to_timestamp=None):
     """
     Send a message to Telegram.
@@ -193,25 +231,12 @@ def send_telegram_message(from_phone=None, to_target=None, content_value=None, r
     content_value = content_value or "Test message from Python API"
     
     postUrl = f"{TELEGRAM_API_URL}/api/messages/send"
-    payload = {
-        "fromPhone": from_phone,
-        "toTarget": to_target,
-        "content": {
-            "type": "text",
-            "value": content_value
-        }
-    }
-    
-    # Add reply parameters if provided
-    if reply_to_message_id:
-        payload["replyTo"] = reply_to_message_id
-    elif reply_to_timestamp:
-        payload["replyToTimestamp"] = reply_to_timestamp
+    payload = _build_send_payload(from_phone, to_target, content_value, reply_to_message_id, reply_to_timestamp)
     
     logger.info(f'Sending message from {from_phone} to {to_target}')
     
     try:
-        response = requests.post(postUrl, json=payload, timeout=10)
+        response = _SESSION.post(postUrl, json=payload, timeout=10)
         response.raise_for_status()
         logger.info(f"Message sent successfully. Status: {response.status_code}")
         return response.json()
@@ -262,7 +287,7 @@ def show_typing_indicator(phone, chatId, duration):
         "duration": duration  
     }
     print('Showing typing indicator at:', postUrl)
-    response = requests.post(postUrl, json=payload)
+    response = _SESSION.post(postUrl, json=payload)
     print_response(response)
     return response.json()
 
@@ -293,10 +318,99 @@ def add_reaction_to_message(phone=None, chat_id=None, message_timestamp=None, em
         "messageTimestamp": message_timestamp,
         "emoji": emoji
     }
-    response = requests.post(postUrl, json=payload)
+    response = _SESSION.post(postUrl, json=payload)
     print_response(response)
     return response.json()
 
+# async variants (used by the executor to send several agents' actions concurrently)
+# The caller owns the httpx.AsyncClient so connections are reused within one event loop.
+
+# Upper bound on a single Retry-After wait, so one rate-limited send can't stall a run
+MAX_RETRY_AFTER_SECONDS = 30
+
+async def _post_respecting_retry_after(client, url, payload, max_retries=2):
+    """
+    POST with the async client, waiting out 429 responses.
+    
+    A 429 means the request was rejected, so resending cannot duplicate a message.
+    Waits for the Retry-After header (seconds), or 1s if it is missing or unparseable.
+    """
+    for attempt in range(max_retries + 1):
+        response = await client.post(url, json=payload, timeout=10)
+        if response.status_code != 429 or attempt == max_retries:
+            return response
+        try:
+            retry_after = float(response.headers.get("Retry-After", 1))
+        except ValueError:
+            retry_after = 1.0
+        retry_after = min(max(retry_after, 0.0), MAX_RETRY_AFTER_SECONDS)
+        logger.warning(f"Rate limited by Telegram API, retrying in {retry_after}s")
+        await asyncio.sleep(retry_after)
+
+async def send_telegram_message_async(client, from_phone, to_target, content_value, reply_to_message_id=None, reply_to_timestamp=None):
+    """
+    Async version of send_telegram_message.
+    
+    Args:
+        client: httpx.AsyncClient to send the request with
+        from_phone: Phone number to send from
+        to_target: Target chat ID or phone number
+        content_value: Message text content
+        reply_to_message_id: Optional message ID to reply to
+        reply_to_timestamp: Optional timestamp to reply to (alternative to message ID)
+    
+    Returns:
+        JSON response from Telegram API
+    """
+    postUrl = f"{TELEGRAM_API_URL}/api/messages/send"
+    payload = _build_send_payload(from_phone, to_target, content_value, reply_to_message_id, reply_to_timestamp)
+    
+    logger.info(f'Sending message from {from_phone} to {to_target}')
+    
+    try:
+        response = await _post_respecting_retry_after(client, postUrl, payload)
+        response.raise_for_status()
+        logger.info(f"Message sent successfully. Status: {response.status_code}")
+        return response.json()
+    except httpx.HTTPError as e:
+        logger.error(f"Error sending message: {e}")
+        return {"success": False, "error": str(e)}
+
+async def show_typing_indicator_async(client, phone, chatId, duration):
+    """Async version of show_typing_indicator."""
+    postUrl = f"{TELEGRAM_API_URL}/api/typing"
+    payload = {
+        "phone": phone,
+        "chatId": chatId,
+        "duration": duration
+    }
+    response = await client.post(postUrl, json=payload, timeout=10)
+    return response.json()
+
+async def add_reaction_to_message_async(client, phone, chat_id, message_timestamp, emoji):
+    """
+    Async version of add_reaction_to_message.
+    
+    Returns:
+        JSON response from Telegram API ({"success": False, "error": ...} on HTTP errors)
+    """
+    if not message_timestamp:
+        raise ValueError("message_timestamp is required")
+    
+    postUrl = f"{TELEGRAM_API_URL}/api/reactions"
+    payload = {
+        "phone": phone,
+        "chatId": chat_id,
+        "messageTimestamp": message_timestamp,
+        "emoji": emoji
+    }
+    try:
+        response = await _post_respecting_retry_after(client, postUrl, payload)
+        return response.json()
+    except httpx.HTTPError as e:
+        logger.error(f"Error adding reaction: {e}")
+        return {"success": False, "error": str(e)}
+
 
 # get_unread_telegram_messages()
 # get_all_chats()
@@ -24,8 +24,13 @@ from nodes.supervisor.component_C import (
     is_user_confident_enough,
     merge_trait_results_by_user,
     run_parallel_trait_analysis,
-    BIG5_TRAITS
+    build_trait_prompts,
+    build_batched_existing_analysis_string,
+    BIG5_TRAITS,
+    _FORMAT_CACHE,
+    _sync_format_cache
 )
+import nodes.supervisor.component_C as component_C
 from utils import get_model_settings, is_agent_sender, load_agent_personas
 
 # Load environment variables from .env file
@@ -219,6 +224,66 @@ def test_format_conversation_for_prompt():
     return True
 
 
+def test_format_cache_picks_up_edited_text():
+    """Test that an edited message text produces a new formatted line."""
+    print("\n" + "=" * 60)
+    print("TEST: format cache - edited message text")
+    print("=" * 60)
+    
+    message = dict(test_messages[0])
+    before = format_conversation_for_prompt([message])
+    
+    message['text'] = 'Edited: actually I prefer classical computing.'
+    after = format_conversation_for_prompt([message])
+    
+    assert 'quantum' in before.lower(), "Original text should be formatted"
+    assert 'Edited: actually I prefer classical computing.' in after, "Edited text should be formatted"
+    assert 'quantum' not in after.lower(), "Stale cached line should not be reused"
+    
+    print("✅ PASSED: Edited text is re-formatted")
+    return True
+
+
+def test_format_cache_picks_up_reaction_changes():
+    """Test that a changed reaction set produces a new formatted line."""
+    print("\n" + "=" * 60)
+    print("TEST: format cache - changed reactions")
+    print("=" * 60)
+    
+    message = dict(test_messages[1], reactions=[{'emoji': '👍', 'count': 1, 'users': []}])
+    before = format_conversation_for_prompt([message])
+    
+    message['reactions'] = [{'emoji': '👍', 'count': 1, 'users': []}, {'emoji': '🔥', 'count': 2, 'users': []}]
+    after = format_conversation_for_prompt([message])
+    
+    assert '🔥' not in before, "New reaction should not be in the first line"
+    assert '🔥' in after, "New reaction should be formatted"
+    
+    print("✅ PASSED: Reaction changes are re-formatted")
+    return True
+
+
+def test_format_cache_cleared_on_agent_name_change():
+    """Test that changing the configured agent names clears the format cache."""
+    print("\n" + "=" * 60)
+    print("TEST: format cache - agent names change")
+    print("=" * 60)
+    
+    format_conversation_for_prompt(test_messages)
+    assert len(_FORMAT_CACHE) > 0, "Formatting should populate the cache"
+    
+    with patch.object(component_C, 'get_all_agent_names', return_value=['Someone Else (Agent)']):
+        _sync_format_cache()
+        assert len(_FORMAT_CACHE) == 0, "Cache should be cleared when agent names change"
+    
+    # Back to the configured names: cache is cleared again and refilled on use
+    format_conversation_for_prompt(test_messages)
+    assert len(_FORMAT_CACHE) > 0
+    
+    print("✅ PASSED: Agent name change clears the cache")
+    return True
+
+
 def test_merge_trait_results_by_user():
     """Test reorganizing trait results from trait->user to user->trait format."""
     print("\n" + "=" * 60)
@@ -254,6 +319,44 @@ def test_merge_trait_results_by_user():
     return True
 
 
+def test_batched_non_object_response_falls_back():
+    """Test that a batched response that is valid JSON but not an object falls back to per-trait calls."""
+    print("\n" + "=" * 60)
+    print("TEST: batched response - JSON list falls back")
+    print("=" * 60)
+    
+    class FakeResponse:
+        def __init__(self, content):
+            self.content = content
+    
+    class FakeModel:
+        def __init__(self):
+            self.calls = 0
+        
+        async def ainvoke(self, messages):
+            self.calls += 1
+            if self.calls == 1:
+                return FakeResponse('[{"Alice": {"score": 4}}]')  # valid JSON, wrong shape
+            return FakeResponse('{"Alice": {"score": 4, "confidence": 0.8, "justification": "test"}}')
+    
+    model = FakeModel()
+    component_C._RESPONSE_CACHE.clear()
+    existing_analysis_str = build_batched_existing_analysis_string({}, ['Alice'])
+    prompts = build_trait_prompts('conversation', 'constraints', {'all_traits': existing_analysis_str})
+    
+    with patch.object(component_C, '_get_model', return_value=model):
+        trait_results, _ = run_parallel_trait_analysis(
+            'conversation', 'model', 0, 'test', 'constraints', {}, ['Alice'], prompts=prompts
+        )
+    
+    assert model.calls == 1 + len(BIG5_TRAITS), "Should make one batched call, then one call per trait"
+    assert all('Alice' in trait_results[trait] for trait in BIG5_TRAITS), "Per-trait results should be used"
+    assert not any(name == 'all_traits' for name, _ in component_C._RESPONSE_CACHE), "Invalid batched response should not be cached"
+    
+    print("✅ PASSED: Non-object batched response falls back to per-trait calls")
+    return True
+
+
 # ============================================================================
 # MAIN NODE TEST (with real LLM calls)
 # ============================================================================
@@ -281,7 +384,7 @@ def test_llm_trait_analysis():
     print("-" * 60)
     
     # Run parallel trait analysis
-    trait_results = run_parallel_trait_analysis(
+    trait_results, _ = run_parallel_trait_analysis(
         conversation,
         model_settings['model'],
         model_settings['temperature'],
@@ -430,7 +533,11 @@ def main():
     results['build_username_userid_mapping'] = test_build_username_userid_mapping()
     results['count_user_messages'] = test_count_user_messages()
     results['format_conversation_for_prompt'] = test_format_conversation_for_prompt()
+    results['format_cache_edited_text'] = test_format_cache_picks_up_edited_text()
+    results['format_cache_reactions'] = test_format_cache_picks_up_reaction_changes()
+    results['format_cache_agent_names'] = test_format_cache_cleared_on_agent_name_change()
     results['merge_trait_results_by_user'] = test_merge_trait_results_by_user()
+    results['batched_non_object_fallback'] = test_batched_non_object_response_falls_back()
     
     # Ask before running LLM tests
     print("\n" + "#" * 70)
@@ -0,0 +1,140 @@
+"""
+Test participant memory
+
+Tests bulk personality saves and per-sender message counts against a
+temporary data directory.
+"""
+
+import sys
+import os
+import copy
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import memory.storage as storage
+from memory.storage import save_json, get_group_directory
+from memory import (
+    save_personality_analyses,
+    get_participant_message_counts,
+    get_participant_data,
+    get_all_participants_data
+)
+
+CHAT_ID = "999"
+
+BIG5_ALICE = {
+    "openness": {"score": 4, "confidence": 0.8, "justification": "curious"},
+    "extraversion": {"score": 3, "confidence": 0.6, "justification": "chatty"}
+}
+BIG5_BOB = {
+    "openness": {"score": 2, "confidence": 0.4, "justification": "practical"}
+}
+
+
+def _write_test_group():
+    """Group history with 3 messages from Alice (100) and 1 from Bob (101), plus participant files."""
+    group_dir = get_group_directory(CHAT_ID)
+    save_json(os.path.join(group_dir, "group_history.json"), [
+        {"id": 4, "senderId": "100", "text": "a3"},
+        {"id": 3, "senderId": "101", "text": "b1"},
+        {"id": 2, "senderId": "100", "text": "a2"},
+        {"id": 1, "senderId": "100", "text": "a1"}
+    ])
+    save_json(os.path.join(group_dir, "participant", "100.json"), {
+        "user_id": "100",
+        "username": "alice",
+        "personality_snapshots": [{"analysis_date": "old", "overall_confidence": 0.3}]
+    })
+    save_json(os.path.join(group_dir, "participant", "101.json"), {
+        "user_id": "101",
+        "username": "bob",
+        "personality_snapshots": []
+    })
+
+
+def test_get_participant_message_counts():
+    """Test counting messages per sender from group history."""
+    print("=" * 70)
+    print("TEST 1: PARTICIPANT MESSAGE COUNTS")
+    print("=" * 70)
+    
+    with tempfile.TemporaryDirectory() as data_dir, patch.object(storage, "DATA_DIR", data_dir):
+        _write_test_group()
+        counts = get_participant_message_counts(CHAT_ID)
+    
+    print(f"Counts: {counts}")
+    assert counts == {"100": 3, "101": 1}, "Should count messages per sender id"
+    print("✓ PASSED\n")
+
+
+def test_save_personality_analyses_round_trip():
+    """Test that bulk-saved snapshots are persisted and read back."""
+    print("=" * 70)
+    print("TEST 2: BULK SAVE ROUND TRIP")
+    print("=" * 70)
+    
+    with tempfile.TemporaryDirectory() as data_dir, patch.object(storage, "DATA_DIR", data_dir):
+        _write_test_group()
+        results = save_personality_analyses(CHAT_ID, {"100": BIG5_ALICE, "101": BIG5_BOB, "102": BIG5_BOB})
+        alice = get_participant_data(CHAT_ID, "100")
+        bob = get_participant_data(CHAT_ID, "101")
+    
+    print(f"Results: {results}")
+    assert results["100"]["success"] and results["101"]["success"]
+    assert results["102"] == {"success": False, "error": "Participant 102 not found"}
+    assert results["100"]["messages_analyzed"] == 3 and results["101"]["messages_analyzed"] == 1
+    assert results["100"]["overall_confidence"] == 0.7
+    
+    # Newest snapshot first, previous snapshots kept
+    assert len(alice["personality_snapshots"]) == 2
+    assert alice["personality_snapshots"][0]["personality_analysis"]["big5"] == BIG5_ALICE
+    assert alice["personality_snapshots"][0]["messages_analyzed_count"] == 3
+    assert alice["personality_snapshots"][1]["analysis_date"] == "old"
+    assert bob["personality_snapshots"][0]["personality_analysis"]["big5"] == BIG5_BOB
+    assert alice["username"] == "alice", "Other participant fields should be preserved"
+    print("✓ PASSED\n")
+
+
+def test_save_personality_analyses_does_not_mutate_inputs():
+    """Test that preloaded participants and the analyses dict are left untouched."""
+    print("=" * 70)
+    print("TEST 3: BULK SAVE DOES NOT MUTATE CALLER DATA")
+    print("=" * 70)
+    
+    with tempfile.TemporaryDirectory() as data_dir, patch.object(storage, "DATA_DIR", data_dir):
+        _write_test_group()
+        participants = get_all_participants_data(CHAT_ID)
+        analyses = {"100": BIG5_ALICE, "101": BIG5_BOB}
+        message_counts = {"100": 3, "101": 1}
+        
+        participants_before = copy.deepcopy(participants)
+        analyses_before = copy.deepcopy(analyses)
+        counts_before = dict(message_counts)
+        
+        save_personality_analyses(CHAT_ID, analyses, message_counts=message_counts, participants=participants)
+        saved = get_participant_data(CHAT_ID, "100")
+    
+    assert participants == participants_before, "Preloaded participant data should not be modified"
+    assert analyses == analyses_before, "Analyses dict should not be modified"
+    assert message_counts == counts_before, "Message counts should not be modified"
+    assert len(saved["personality_snapshots"]) == 2, "Snapshot should still be written to disk"
+    print("✓ PASSED\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 70)
+    print("PARTICIPANT MEMORY TEST SUITE")
+    print("=" * 70 + "\n")
+    
+    test_get_participant_message_counts()
+    test_save_personality_analyses_round_trip()
+    test_save_personality_analyses_does_not_mutate_inputs()
+    
+    print("=" * 70)
+    print("ALL TESTS PASSED! ✓")
+    print("=" * 70)
@@ -0,0 +1,106 @@
+"""
+Test Telegram API helpers
+
+Tests the async send helper's handling of 429 (rate limited) responses.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+
+# Add parent directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import telegram_exm
+from telegram_exm import send_telegram_message_async, MAX_RETRY_AFTER_SECONDS
+
+
+def _send_with_responses(responses):
+    """Send one message through a mocked transport; returns (result, request_count, sleeps)."""
+    requests_seen = []
+    sleeps = []
+    
+    def handler(request):
+        requests_seen.append(request)
+        return responses[min(len(requests_seen), len(responses)) - 1]
+    
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+    
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await send_telegram_message_async(client, "+123", "456", "hello")
+    
+    with patch.object(telegram_exm.asyncio, "sleep", fake_sleep):
+        result = asyncio.run(run())
+    return result, len(requests_seen), sleeps
+
+
+def test_retry_after_is_capped_then_succeeds():
+    """Test that a 429 waits the (capped) Retry-After and the retry's result is returned."""
+    print("=" * 70)
+    print("TEST 1: 429 WITH RETRY-AFTER, THEN SUCCESS")
+    print("=" * 70)
+    
+    result, request_count, sleeps = _send_with_responses([
+        httpx.Response(429, headers={"Retry-After": "120"}),
+        httpx.Response(200, json={"success": True, "messageId": 7})
+    ])
+    
+    print(f"Result: {result}, requests: {request_count}, sleeps: {sleeps}")
+    assert result == {"success": True, "messageId": 7}, "Should return the retried response"
+    assert request_count == 2, "Should send once more after the 429"
+    assert sleeps == [MAX_RETRY_AFTER_SECONDS], "Retry-After should be capped"
+    print("✓ PASSED\n")
+
+
+def test_retry_after_missing_header_defaults():
+    """Test that a 429 without a usable Retry-After waits 1 second."""
+    print("=" * 70)
+    print("TEST 2: 429 WITHOUT RETRY-AFTER")
+    print("=" * 70)
+    
+    result, request_count, sleeps = _send_with_responses([
+        httpx.Response(429, headers={"Retry-After": "soon"}),
+        httpx.Response(200, json={"success": True})
+    ])
+    
+    assert result == {"success": True}
+    assert request_count == 2
+    assert sleeps == [1.0], "Unparseable Retry-After should fall back to 1s"
+    print("✓ PASSED\n")
+
+
+def test_persistent_429_gives_up():
+    """Test that repeated 429s stop after two retries and return an error result."""
+    print("=" * 70)
+    print("TEST 3: PERSISTENT 429")
+    print("=" * 70)
+    
+    result, request_count, sleeps = _send_with_responses([
+        httpx.Response(429, headers={"Retry-After": "2"})
+    ])
+    
+    print(f"Result: {result}, requests: {request_count}, sleeps: {sleeps}")
+    assert result["success"] is False, "Should report failure"
+    assert request_count == 3, "Should send the original request plus two retries"
+    assert sleeps == [2.0, 2.0]
+    print("✓ PASSED\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 70)
+    print("TELEGRAM API TEST SUITE")
+    print("=" * 70 + "\n")
+    
+    test_retry_after_is_capped_then_succeeds()
+    test_retry_after_missing_header_defaults()
+    test_persistent_429_gives_up()
+    
+    print("=" * 70)
+    print("ALL TESTS PASSED! ✓")
+    print("=" * 70)
@@ -0,0 +1,109 @@
+"""
+Test shared utilities
+
+Tests:
+1. convert_timestamp_to_iso fast path matches the strptime path (including None)
+2. Stored timestamps are converted to the Telegram API's ISO format
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils import convert_timestamp_to_iso
+
+
+def _convert_with_strptime(timestamp_str):
+    """Reference (pre-fast-path) conversion: strptime/strftime, None on failure."""
+    if not timestamp_str:
+        return None
+    try:
+        dt = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
+        return dt.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+    except Exception:
+        return None
+
+
+TIMESTAMPS = [
+    # Stored group_history format (naive, what the fast path handles)
+    "2025-12-29 10:05:00",
+    "2024-02-29 23:59:59",
+    "2000-01-01 00:00:00",
+    # Right layout but out-of-range values
+    "2023-02-29 10:00:00",
+    "2025-13-01 10:00:00",
+    "2025-12-29 24:00:00",
+    "2025-12-29 10:60:00",
+    # ISO timestamps as returned by the Telegram API
+    "2025-12-29T10:05:00Z",
+    "2025-12-29T10:05:00.000Z",
+    "2025-12-29 10:05:00Z",
+    # Offsets
+    "2025-12-29T10:05:00+00:00",
+    "2025-12-29 10:05:00+02:00",
+    # Other naive variants
+    "2025-12-29T10:05:00",
+    "2025-12-29 10:05",
+    "2025-12-29 10:05:00.123",
+    "2025-12-29",
+    # Empty / garbage
+    "",
+    None,
+    "not a timestamp",
+    "2025/12/29 10:05:00",
+]
+
+
+def test_convert_timestamp_to_iso_matches_strptime():
+    """Fast path and strptime path give the same result (including None)"""
+    print("\n" + "="*80)
+    print("TEST 1: convert_timestamp_to_iso matches strptime")
+    print("="*80)
+    
+    for timestamp_str in TIMESTAMPS:
+        result = convert_timestamp_to_iso(timestamp_str)
+        expected = _convert_with_strptime(timestamp_str)
+        print(f"  {timestamp_str!r} -> {result!r}")
+        assert result == expected, f"{timestamp_str!r}: got {result!r}, expected {expected!r}"
+    
+    print("\n✅ TEST 1 PASSED")
+
+
+def test_convert_timestamp_to_iso_format():
+    """Stored timestamps are converted to the Telegram API's ISO format"""
+    print("\n" + "="*80)
+    print("TEST 2: convert_timestamp_to_iso output format")
+    print("="*80)
+    
+    result = convert_timestamp_to_iso("2025-12-29 10:05:00")
+    print(f"  Result: {result}")
+    assert result == "2025-12-29T10:05:00.000Z", f"Unexpected format: {result}"
+    
+    print("\n✅ TEST 2 PASSED")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*80)
+    print("TESTING SHARED UTILITIES")
+    print("="*80)
+    
+    try:
+        test_convert_timestamp_to_iso_matches_strptime()
+        test_convert_timestamp_to_iso_format()
+        
+        print("\n" + "="*80)
+        print("✅ ALL TESTS PASSED!")
+        print("="*80)
+        
+    except AssertionError as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        import traceback
+        traceback.print_exc()
@@ -4,8 +4,11 @@ Utility functions for LangGraph nodes.
 Provides common functionality for loading prompts, model configs, and formatting data.
 """
 
+import copy
 import json
 import os
+import orjson
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional
 from datetime import datetime
@@ -20,6 +23,24 @@ CONFIG_DIR = LANGGRAPH_DIR / "config"
 MODEL_CONFIG_PATH = CONFIG_DIR / "model_config.json"
 SUPERVISOR_CONFIG_PATH = CONFIG_DIR / "supervisor_config.json"
 
+def load_supervisor_config() -> Dict[str, Any]:
+    """
+    Load supervisor_config.json, cached in memory until the file changes.
+    
+    The returned dict is shared between callers - do not modify it.
+    
+    Returns:
+        Parsed supervisor config
+    """
+    return _load_supervisor_config_cached(os.path.getmtime(SUPERVISOR_CONFIG_PATH))
+
+
+@lru_cache(maxsize=1)
+def _load_supervisor_config_cached(config_mtime: float) -> Dict[str, Any]:
+    """Parse supervisor_config.json; cached per modification time."""
+    return load_json_file(SUPERVISOR_CONFIG_PATH)
+
+
 def get_all_agent_usernames() -> list:
     """
     Get usernames of all agents in the system.
@@ -27,7 +48,7 @@ def get_all_agent_usernames() -> list:
     Returns:
         List of agent usernames from supervisor config
     """
-    supervisor_config = load_json_file(SUPERVISOR_CONFIG_PATH)
+    supervisor_config = load_supervisor_config()
     return [agent["username"] for agent in supervisor_config["agents"]]
 
 def get_all_agent_names() -> list:
@@ -37,7 +58,7 @@ def get_all_agent_names() -> list:
     Returns:
         List of agent names from supervisor config
     """
-    supervisor_config = load_json_file(SUPERVISOR_CONFIG_PATH)
+    supervisor_config = load_supervisor_config()
     return [agent["name"] for agent in supervisor_config["agents"]]
 
 
@@ -99,25 +120,48 @@ def load_agent_personas() -> list:
     """
     Load all agent personas from files specified in config.
     
+    Personas are cached in memory and reloaded when supervisor_config.json or
+    any persona file changes. Each call returns fresh copies, so callers may
+    modify them freely.
+    
     Returns:
         List of persona dictionaries
     """
-    supervisor_config = load_json_file(SUPERVISOR_CONFIG_PATH)
+    supervisor_config = load_supervisor_config()
+    persona_files = tuple(
+        (agent_config["persona_file"], _get_mtime_or_none(LANGGRAPH_DIR / agent_config["persona_file"]))
+        for agent_config in supervisor_config.get("agents", [])
+    )
+    personas = _load_agent_personas_cached(os.path.getmtime(SUPERVISOR_CONFIG_PATH), persona_files)
+    return copy.deepcopy(list(personas))
+
+
+def _get_mtime_or_none(path: Path) -> Optional[float]:
+    """File modification time, or None if the file can't be read (logged by the loader)."""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+@lru_cache(maxsize=1)
+def _load_agent_personas_cached(config_mtime: float, persona_files: tuple) -> tuple:
+    """Load personas from disk; cached per config mtime and (persona_file, mtime) pairs."""
+    supervisor_config = load_supervisor_config()
     personas = []
     
     for agent_config in supervisor_config.get("agents", []):
         persona_path = LANGGRAPH_DIR / agent_config["persona_file"]
         try:
-            with open(persona_path, 'r', encoding='utf-8') as f:
-                persona_data = json.load(f)
-                # Ensure username/name from config are also available if needed
-                if "username" not in persona_data and "username" in agent_config:
-                    persona_data["user_name"] = agent_config["username"]
-                personas.append(persona_data)
+            persona_data = orjson.loads(persona_path.read_bytes())
+            # Ensure username/name from config are also available if needed
+            if "username" not in persona_data and "username" in agent_config:
+                persona_data["user_name"] = agent_config["username"]
+            personas.append(persona_data)
         except Exception as e:
             logger.error(f"Failed to load persona from {persona_path}: {e}")
     
-    return personas
+    return tuple(personas)
 
 
 def is_agent_sender(
@@ -190,6 +234,87 @@ def is_agent_sender(
     return False
 
 
+def build_agent_identity_sets(agent_personas: Optional[list] = None) -> Dict[str, Any]:
+    """
+    Precompute lowercase agent identifiers for O(1) agent checks.
+    
+    Use with is_agent_identity; matching rules are the same as is_agent_sender.
+    
+    Args:
+        agent_personas: List of agent personas. If None, loads them.
+        
+    Returns:
+        Dict of frozensets: usernames, full_names, first_names, first_last_pairs
+    """
+    if agent_personas is None:
+        agent_personas = load_agent_personas()
+    
+    usernames, full_names, first_names, first_last_pairs = set(), set(), set(), set()
+    for persona in agent_personas:
+        p_username = persona.get("user_name", "").lower()
+        p_first = persona.get("first_name", "").lower()
+        p_last = persona.get("last_name", "").lower()
+        p_full = f"{p_first} {p_last}".strip()
+        
+        if p_username:
+            usernames.add(p_username)
+        if p_full:
+            full_names.add(p_full)
+        if p_first:
+            first_names.add(p_first)
+        if p_first and p_last:
+            first_last_pairs.add((p_first, p_last))
+    
+    return {
+        "usernames": frozenset(usernames),
+        "full_names": frozenset(full_names),
+        "first_names": frozenset(first_names),
+        "first_last_pairs": frozenset(first_last_pairs)
+    }
+
+
+def is_agent_identity(
+    agent_identity: Dict[str, Any],
+    message: Optional[Dict[str, Any]] = None,
+    display_name: Optional[str] = None
+) -> bool:
+    """
+    Set-based equivalent of is_agent_sender using build_agent_identity_sets output.
+    
+    Args:
+        agent_identity: Output of build_agent_identity_sets
+        message: Message dict with sender_username, sender_first_name, sender_last_name
+        display_name: Display name string (e.g. "Sandra K")
+        
+    Returns:
+        True if the sender is an agent
+    """
+    # Case 1: Check by display name (username, full name, first name or first word)
+    if display_name:
+        display_name = display_name.strip().lower()
+        if not display_name:
+            return False
+        return (
+            display_name in agent_identity["usernames"]
+            or display_name in agent_identity["full_names"]
+            or display_name in agent_identity["first_names"]
+            or display_name.split()[0] in agent_identity["first_names"]
+        )
+    
+    # Case 2: Check by message details (username, or first + last name)
+    if message:
+        sender_username = message.get("sender_username", "").lower()
+        if sender_username and sender_username in agent_identity["usernames"]:
+            return True
+        
+        sender_first = message.get("sender_first_name", "").lower()
+        sender_last = message.get("sender_last_name", "").lower()
+        if sender_first and sender_last:
+            return (sender_first, sender_last) in agent_identity["first_last_pairs"]
+    
+    return False
+
+
 def get_other_agents_info(current_agent_name: str) -> list:
     """
     Get info about other agents in the system, excluding the current agent.
@@ -200,7 +325,7 @@ def get_other_agents_info(current_agent_name: str) -> list:
     Returns:
         List of dicts with agent_name, agent_type, and agent_goal
     """
-    supervisor_config = load_json_file(SUPERVISOR_CONFIG_PATH)
+    supervisor_config = load_supervisor_config()
     return [
         {
             "agent_name": agent["name"],
@@ -238,11 +363,12 @@ def format_other_agents_for_prompt(current_agent_name: str) -> str:
 def load_prompt(prompt_path: str) -> str:
     """
     Load a prompt template from file.
+    
+    Templates are cached in memory and re-read only when the file changes.
     """
     full_path = PROMPTS_DIR / prompt_path
     try:
-        with open(full_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        return _read_prompt_cached(full_path, os.path.getmtime(full_path))
     except FileNotFoundError:
         logger.error(f"Prompt file not found: {full_path}")
         raise
@@ -251,6 +377,13 @@ def load_prompt(prompt_path: str) -> str:
         raise
 
 
+@lru_cache(maxsize=None)
+def _read_prompt_cached(full_path: Path, mtime: float) -> str:
+    """Read a prompt file; cached per (path, modification time)."""
+    with open(full_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
 def load_model_config() -> Dict[str, Any]:
     """
     Load model configuration from config file.
@@ -466,8 +599,8 @@ def format_message_for_prompt(msg: Dict[str, Any],
 
 def load_json_file(file_path: Path) -> Dict[str, Any]:
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError, so the handler below still applies
+        return orjson.loads(Path(file_path).read_bytes())
     except FileNotFoundError:
         logger.error(f"JSON file not found: {file_path}")
         raise
@@ -513,11 +646,19 @@ def convert_timestamp_to_iso(timestamp_str: str) -> Optional[str]:
     Returns:
         ISO format timestamp string or None if conversion fails
     """
-    from datetime import datetime
-    
     if not timestamp_str:
         return None
     
+    # Fast path: the input already has the right layout, only the separator and
+    # suffix change. fromisoformat (C-implemented) still rejects out-of-range values.
+    ts = timestamp_str
+    if len(ts) == 19 and ts[4] == ts[7] == '-' and ts[10] == ' ' and ts[13] == ts[16] == ':':
+        try:
+            datetime.fromisoformat(ts)
+            return ts[:10] + 'T' + ts[11:] + '.000Z'
+        except ValueError:
+            pass
+    
     try:
         dt = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
         return dt.strftime('%Y-%m-%dT%H:%M:%S.000Z')
@@ -634,8 +775,8 @@ def format_personality_summary(recent_messages: list) -> str:
         else:
             return "Moderate"
     
-    # Get agent personas to skip them
-    agent_personas = load_agent_personas()
+    # Get agent identity sets once to skip agents with O(1) lookups
+    agent_identity = build_agent_identity_sets()
     
     # Track unique participants by sender_id
     participants = {}  # sender_id -> {name, personality}
@@ -659,7 +800,7 @@ def format_personality_summary(recent_messages: list) -> str:
             continue
         
         # Skip agents
-        if is_agent_sender(message=msg, agent_personas=agent_personas):
+        if is_agent_identity(agent_identity, message=msg):
             continue
         
         # Get personality data